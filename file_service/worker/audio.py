@@ -18,6 +18,18 @@ from base.database.mongodb import client
 from models.audios import Audios
 
 
+async def init_db():
+    """
+    Init beanie for a job, indexes are built by the API startup
+    rq runs every job in a forked work horse with its own event loop, so this runs per job
+    """
+    await beanie.init_beanie(
+        database=client.file_service,
+        document_models=document_models,
+        skip_indexes=True,
+    )
+
+
 # --- Main Download Function ---
 def download_audio(url, output_path=".cache/audios") -> str:
     """
@@ -171,10 +183,7 @@ async def process_audio(audio_url: str, priority: str):
     except RuntimeError as e2:
         print(e2)
         raise HTTPException(status_code=400, detail="Server error in when processing")
-    await beanie.init_beanie(
-        database=client.file_service,
-        document_models=document_models,
-    )
+    await init_db()
     await Audios(
         audio_url=audio_url,
         storage_url=storage_url,
@@ -1,18 +1,56 @@
+import base64
+import binascii
+from enum import Enum
 from typing import Any, TypeVar, Generic
 from bson import ObjectId
+from bson.errors import InvalidId
 
 from pydantic import BaseModel
 from beanie import Document
+from beanie.odm.utils.parsing import parse_obj
 
-from .http_status import NotFound
+from utils.beanie_odm import get_projections_from_model
+from .http_status import NotFound, BadRequest
 
 
 ModelType = TypeVar("ModelType", bound=Document)
+ProjectionType = TypeVar("ProjectionType", bound=BaseModel)
+
+
+class CountModeEnum(str, Enum):
+    # exact total, computed in the same aggregation as the page items
+    EXACT = "exact"
+    # collection metadata count (no filter) or a count capped at ESTIMATED_COUNT_LIMIT
+    ESTIMATED = "estimated"
+    # skip counting, total is None
+    NONE = "none"
+
+
+ESTIMATED_COUNT_LIMIT = 10_000
+
+
+def encode_cursor(last_id: ObjectId) -> str:
+    """
+    Encode the last _id of a page to an opaque url-safe cursor
+    """
+    return base64.urlsafe_b64encode(ObjectId(last_id).binary).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    """
+    Decode a cursor from encode_cursor back to the _id it points to
+    """
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise BadRequest(detail="Invalid cursor")
 
 
 class BaseCRUD(Generic[ModelType]):
     def __init__(self, model: type[ModelType]):
         self.model = model
+        # projection model -> $project, see _get_projection
+        self._projections: dict[type[BaseModel], dict[str, str]] = {}
 
     def _to_dict(self, data: BaseModel | dict[str, Any], exclude_unset=False) -> dict[str, Any]:
         """
@@ -69,6 +107,23 @@ class BaseCRUD(Generic[ModelType]):
                     filters.append(field == value)
         return filters
 
+    def _get_projection(self, projection_model: type[BaseModel]) -> dict[str, str]:
+        """
+        $project of the fields of a response schema (id from _id)
+        Example:
+            GetTaskResponse -> {"title": "$title", ..., "id": "$_id"}
+        """
+        projection = self._projections.get(projection_model)
+        if projection is None:
+            projection = get_projections_from_model(projection_model)
+            self._projections[projection_model] = projection
+        return projection
+
+    def _parse_projection(
+        self, projection_model: type[ProjectionType], docs: list[dict]
+    ) -> list[ProjectionType]:
+        return [projection_model.model_validate(doc) for doc in docs]
+
     def _raise_not_found(self, **kwargs):
         """
         Raise not found error message
@@ -77,14 +132,17 @@ class BaseCRUD(Generic[ModelType]):
         details = ", ".join(criteria)
         raise NotFound(detail=f"{self.model.__name__} with {details} not found")
 
-    async def get_one(self, **kwargs) -> ModelType | None:
+    async def get_one(
+        self, projection_model: type[ProjectionType] | None = None, **kwargs
+    ) -> ModelType | ProjectionType | None:
         """
         Get a record by with match attributes
         Args:
+            projection_model: response schema, only its fields are fetched (no Beanie Document)
             match_<attr>: Any (Attributes that will convert to filter the result)
             raise_if_missing: bool (Raise missing or return None)
         Returns:
-            Beanie Document object
+            Beanie Document object, or projection_model object
 
         Example 1:
             Args:
@@ -109,47 +167,159 @@ class BaseCRUD(Generic[ModelType]):
         if not filters:
             raise ValueError("At least one match_ parameter is required")
 
-        query = self.model.find_one(*filters, sort=[("start_at", -1)])
-        obj = await query
+        if projection_model is None:
+            obj = await self.model.find_one(*filters, sort=[("start_at", -1)])
+        else:
+            doc = await self.model.get_pymongo_collection().find_one(
+                self.model.find(*filters).get_filter_query(),
+                self._get_projection(projection_model),
+                sort=[("start_at", -1)],
+            )
+            obj = projection_model.model_validate(doc) if doc else None
 
         raise_if_missing = kwargs.pop("raise_if_missing", False)
         if raise_if_missing and obj is None:
             raise self._raise_not_found(**kwargs)
         return obj
 
+    async def _estimate_count(self, filters: list[Any]) -> int:
+        """
+        Cheap total for very large collections
+        - No filter: collection metadata count (no scan)
+        - With filter: count capped at ESTIMATED_COUNT_LIMIT
+        """
+        collection = self.model.get_pymongo_collection()
+        if not filters:
+            return await collection.estimated_document_count()
+        filter_query = self.model.find(*filters).get_filter_query()
+        return await collection.count_documents(filter_query, limit=ESTIMATED_COUNT_LIMIT)
+
     async def get_list(
-        self, skip: int = 0, limit: int = 100, **kwargs
-    ) -> tuple[list[ModelType], int]:
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        count_mode: CountModeEnum = CountModeEnum.EXACT,
+        after: str | None = None,
+        projection_model: type[ProjectionType] | None = None,
+        **kwargs,
+    ) -> tuple[list[ModelType] | list[ProjectionType], int | None, str | None]:
         """
         Get list with filter and pagination
         Args:
             skip: int
             limit: int
+            count_mode: CountModeEnum (exact | estimated | none)
+            after: str (cursor from previous page, switch to keyset pagination and ignore skip)
+            projection_model: response schema, only its fields are fetched and items are
+                parsed straight to it (no Beanie Document)
             match_<attr>: Attributes that will convert to filter the result
         Returns:
-            Tuple of (list of objects, total count)
-        Example:
+            Tuple of (list of objects, total count, next cursor)
+            total count is None when count_mode is none
+            next cursor is None on the last page
+        Example 1:
             Args:
                 match_email: 'abc@gmail.com' #match condition
                 match_roles: ['user', 'admin'] #match IN condition
             -> Build query:
-                Tasks.find(Tasks.email == 'abc@gmail.com', Tasks.roles in ['user', 'admin'])
+                Tasks.aggregate([
+                    {"$match": {"email": "abc@gmail.com", "roles": {"$in": ["user", "admin"]}}},
+                    {"$sort": {"_id": -1}},
+                    {"$facet": {"items": [{"$skip": 0}, {"$limit": 100}], "total": [{"$count": "count"}]}},
+                ])
+            -> Return:
+                ([Tasks(...), ...], total, next_cursor)
+
+        Example 2:
+            Args:
+                match_email: 'abc@gmail.com' #match condition
+                after: 'ZfG0cXaMrTwGXCt5' #cursor of ObjectId('65f1b47176...')
+            -> Build query:
+                Tasks.find(Tasks.email == 'abc@gmail.com', Tasks.id < ObjectId('65f1b47176...'))
+                    .sort(-Tasks.id).limit(100)
             -> Return:
-                ([Tasks(...), ...], total)
+                ([Tasks(...), ...], total, next_cursor)
         """
         filters = self._get_filter_conditions(**kwargs)
 
-        # get all
+        # keyset pagination: range scan on _id, cost does not grow with page depth
+        if after is not None:
+            query = self.model.find(*filters, self.model.id < decode_cursor(after))
+            if projection_model is None:
+                obj_list = await query.sort(-self.model.id).limit(limit).to_list()
+            else:
+                obj_list = await self._find_projection(query, projection_model, 0, limit)
+            total = await self._count(filters, count_mode)
+            return obj_list, total, self._next_cursor(obj_list, limit)
+
         query = self.model.find(*filters)
-        query = query.sort(-self.model.id)  # Sort by _id descending to get newest first
-        query = query.skip(skip).limit(limit)
-        obj_list = await query.to_list()
 
-        # count
-        count_query = self.model.find(*filters)
-        total = await count_query.count()
+        # page items and total in one round trip
+        if count_mode == CountModeEnum.EXACT:
+            items_pipeline = []
+            if skip:
+                items_pipeline.append({"$skip": skip})
+            if limit:
+                items_pipeline.append({"$limit": limit})
+            if projection_model is not None:
+                items_pipeline.append({"$project": self._get_projection(projection_model)})
+            pipeline = [
+                {"$sort": {"_id": -1}},  # Sort by _id descending to get newest first
+                {
+                    "$facet": {
+                        "items": items_pipeline,
+                        "total": [{"$count": "count"}],
+                    }
+                },
+            ]
+            result = await query.aggregate(pipeline).to_list()
+            facet = result[0] if result else {"items": [], "total": []}
+            if projection_model is None:
+                obj_list = [parse_obj(self.model, doc) for doc in facet["items"]]
+            else:
+                obj_list = self._parse_projection(projection_model, facet["items"])
+            total = facet["total"][0]["count"] if facet["total"] else 0
+            return obj_list, total, self._next_cursor(obj_list, limit)
+
+        if projection_model is None:
+            query = query.sort(-self.model.id)  # Sort by _id descending to get newest first
+            query = query.skip(skip).limit(limit)
+            obj_list = await query.to_list()
+        else:
+            obj_list = await self._find_projection(query, projection_model, skip, limit)
+        total = await self._count(filters, count_mode)
+
+        return obj_list, total, self._next_cursor(obj_list, limit)
 
-        return obj_list, total
+    async def _find_projection(
+        self, query, projection_model: type[ProjectionType], skip: int, limit: int
+    ) -> list[ProjectionType]:
+        """
+        Newest first page of a find query, only fields of projection_model are fetched
+        """
+        cursor = self.model.get_pymongo_collection().find(
+            query.get_filter_query(), self._get_projection(projection_model)
+        )
+        cursor = cursor.sort("_id", -1).skip(skip).limit(limit)
+        return self._parse_projection(projection_model, await cursor.to_list(length=None))
+
+    async def _count(self, filters: list[Any], count_mode: CountModeEnum) -> int | None:
+        """
+        Count filtered records separately from the page query
+        """
+        if count_mode == CountModeEnum.EXACT:
+            return await self.model.find(*filters).count()
+        if count_mode == CountModeEnum.ESTIMATED:
+            return await self._estimate_count(filters)
+        return None
+
+    def _next_cursor(self, obj_list: list[Any], limit: int) -> str | None:
+        """
+        Cursor of the next page, None if this page is the last one
+        """
+        if not obj_list or len(obj_list) < limit:
+            return None
+        return encode_cursor(obj_list[-1].id)
 
     async def create(self, data: dict[str, Any] | BaseModel, **kwargs) -> ModelType:
         """Create new record"""
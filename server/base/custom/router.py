@@ -6,12 +6,38 @@ from fastapi import APIRouter, Response
 from fastapi.routing import APIRoute
 
 
+def get_pagination_headers(
+    total: int | None, page: int, per_page: int, next_cursor: str | None = None
+) -> dict[str, str]:
+    """
+    Pagination headers of a list response
+    A None 'total' (counting skipped) omits the x-total-count/x-total-pages headers.
+    A None 'next_cursor' (last page) omits the x-next-cursor header.
+    """
+    headers = {}
+    if total is not None:
+        # Avoid division by zero
+        total_pages = math.ceil(total / per_page) if per_page > 0 else 0
+        # Headers must be strings
+        headers["x-total-count"] = str(total)
+        headers["x-total-pages"] = str(total_pages)
+    headers["x-page"] = str(page)
+    headers["x-per-page"] = str(per_page)
+    if next_cursor is not None:
+        headers["x-next-cursor"] = next_cursor
+    return headers
+
+
 class PaginationRoute(APIRoute):
     """
     Custom Route Handler that intercepts the response to inject pagination headers.
 
-    It expects the endpoint to return a tuple: (items, total_count).
-    It extracts 'total_count' to set headers and returns only 'items' to the client.
+    It expects the endpoint to return a tuple: (items, total_count) or
+    (items, total_count, next_cursor).
+    It extracts 'total_count' and 'next_cursor' to set headers and returns only 'items'
+    to the client.
+    A None 'total_count' (counting skipped) omits the x-total-count/x-total-pages headers.
+    A None 'next_cursor' (last page) omits the x-next-cursor header.
     """
 
     def __init__(self, path: str, endpoint: Callable, **kwargs):
@@ -20,10 +46,11 @@ class PaginationRoute(APIRoute):
             # 1. Execute the actual endpoint logic
             result = await endpoint(*args, **kw)
 
-            # 2. Check if the result is a tuple format (items, total_count)
+            # 2. Check if the result is a tuple format (items, total_count[, next_cursor])
             # This logic only applies if the developer returns a tuple.
-            if isinstance(result, tuple) and len(result) == 2:
-                items, total = result
+            if isinstance(result, tuple) and len(result) in (2, 3):
+                items, total, *rest = result
+                next_cursor = rest[0] if rest else None
 
                 # 3. Locate the injected 'Response' object in kwargs
                 response_obj = next((v for v in kw.values() if isinstance(v, Response)), None)
@@ -37,17 +64,11 @@ class PaginationRoute(APIRoute):
 
                 # 5. Calculate and set pagination headers
                 if response_obj and pagination_obj:
-                    per_page = pagination_obj.per_page
-                    page = pagination_obj.page
-
-                    # Avoid division by zero
-                    total_pages = math.ceil(total / per_page) if per_page > 0 else 0
-
-                    # Headers must be strings
-                    response_obj.headers["x-total-count"] = str(total)
-                    response_obj.headers["x-total-pages"] = str(total_pages)
-                    response_obj.headers["x-page"] = str(page)
-                    response_obj.headers["x-per-page"] = str(per_page)
+                    response_obj.headers.update(
+                        get_pagination_headers(
+                            total, pagination_obj.page, pagination_obj.per_page, next_cursor
+                        )
+                    )
 
                 # 6. Return only the data list to satisfy the response_model
                 return items
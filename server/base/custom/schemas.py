@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
 
+from .crud import CountModeEnum
+
 
 class BaseSchema(BaseModel):
     pass
@@ -10,7 +12,8 @@ class BaseSchema(BaseModel):
     def get_db_query(self):
         data = self.model_dump(exclude_none=True)
         if self.page is not None and self.per_page is not None:
-            skip = (self.page - 1) * self.per_page
+            # cursor pages start right after the cursor, page number is ignored
+            skip = 0 if data.get("after") else (self.page - 1) * self.per_page
             limit = self.per_page
             data["skip"] = skip
             data["limit"] = limit
@@ -23,3 +26,12 @@ class BaseSchema(BaseModel):
 class Pagination(BaseSchema):
     page: int | None = Field(default=1, min=1)
     per_page: int | None = Field(default=100, min=1)
+
+
+class CursorPagination(Pagination):
+    """
+    Pagination with the count mode and cursor of BaseCRUD.get_list
+    """
+
+    count_mode: CountModeEnum = CountModeEnum.EXACT
+    after: str | None = Field(default=None, description="Cursor from x-next-cursor header")
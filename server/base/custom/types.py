@@ -1,6 +1,7 @@
 from typing import Any
 
 from beanie.odm.fields import PydanticObjectId
+from bson import ObjectId
 from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
 from pydantic_core import CoreSchema, core_schema
 
@@ -14,7 +15,8 @@ class IDStr(str):
             cls.validate,
             schema=core_schema.union_schema(
                 [
-                    core_schema.is_instance_schema(PydanticObjectId),
+                    # ObjectId of a raw projected document, PydanticObjectId of a Document
+                    core_schema.is_instance_schema(ObjectId),
                     core_schema.str_schema(),
                 ]
             ),
@@ -1,11 +1,23 @@
 # default
+import time
 
 # local
 from .settings import app
 from models import connect_db
+from utils.broadcaster import close_broadcasters
+from utils.counters import start_counters, stop_counters
 
 
 @app.on_event("startup")
 async def startup():
+    start = time.perf_counter()
     await connect_db()
-    print("Start up done")
+    start_counters()
+    print(f"Start up done in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    # write increments buffered since the last flush
+    await stop_counters()
+    await close_broadcasters()
@@ -30,6 +30,15 @@ class ENVEnum(Enum):
     PROD = "PROD"
 
 
+class IndexBuildEnum(Enum):
+    # build indexes before serving (slow cold start on big collections)
+    STARTUP = "STARTUP"
+    # build unique indexes before serving, the others in background
+    DEFERRED = "DEFERRED"
+    # indexes are built by another replica or a deploy step
+    SKIP = "SKIP"
+
+
 class Settings(BaseSettings):
     # TODO: change this to ENVEnum when lib support
     ENV: str = ENVEnum.DEV.value
@@ -39,6 +48,7 @@ class Settings(BaseSettings):
     ACCESS_KEY: str = "NoNeed"
 
     DATABASE_URL: str
+    DB_INDEX_BUILD: str = IndexBuildEnum.DEFERRED.value
 
     AWS_ACCESS_KEY_ID: str = "NoNeed"
     AWS_ACCESS_ACCESS_KEY: str = "NoNeed"
@@ -62,6 +72,18 @@ class Settings(BaseSettings):
     LIVEKIT_API_SECRET: str = "secretsecret"
     LIVEKIT_URL: str = "ws://livekit:7880"
 
+    # password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_CONCURRENCY: int = 2
+
+    # seconds between flushes of buffered counters (post views, ...)
+    COUNTER_FLUSH_INTERVAL: float = 10
+
+    # optional, shared cache across workers (needs the `redis` extra)
+    REDIS_URL: str = ""
+    STATISTICS_CACHE_TTL: int = 600
+    POST_RESPONSE_CACHE_TTL: int = 60
+
 
 settings = Settings()
 is_dev_env = settings.ENV == ENVEnum.DEV.value
@@ -0,0 +1,77 @@
+"""
+Per-request overhead of AuthHandler.auth_wrapper, before and after the verified token cache
+Usage:
+    cd server && python benchmarks/auth_token.py
+"""
+
+# default
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# libraries
+import jwt
+from fastapi.security import HTTPAuthorizationCredentials
+
+# local
+from routers.authentication.auth import AuthHandler
+
+NUMBER = 20000
+
+handler = AuthHandler()
+user = {
+    "id": "111111111111111111111111",
+    "discord_id": "111111111111111111",
+    "name": "khoitm",
+    "email": "dbsiksfikf@gmail.com",
+    "roles": ["owner", "admin"],
+}
+token = handler.encode_token(user)
+header = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+invalid_header = HTTPAuthorizationCredentials(scheme="Bearer", credentials="invalid")
+
+
+def decode_token_before(token):
+    payload = jwt.decode(token, handler.secret, algorithms=["HS256"])
+    return payload["sub"]
+
+
+def auth_wrapper_before(cookie_token, header_token):
+    # exceptions used for flow control, signature verified on every request
+    try:
+        return decode_token_before(header_token.credentials)
+    except Exception as e:
+        exception = e
+    try:
+        return decode_token_before(cookie_token)
+    except Exception as e:
+        exception = e
+    raise exception
+
+
+def report(name, before, after):
+    before_us = timeit.timeit(before, number=NUMBER) / NUMBER * 1e6
+    after_us = timeit.timeit(after, number=NUMBER) / NUMBER * 1e6
+    print(
+        f"{name:<24} before {before_us:7.2f}us  after {after_us:7.2f}us  x{before_us / after_us:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    report(
+        "header token",
+        lambda: auth_wrapper_before(None, header),
+        lambda: handler.auth_wrapper(None, header),
+    )
+    report(
+        "cookie token",
+        lambda: auth_wrapper_before(token, None),
+        lambda: handler.auth_wrapper(token, None),
+    )
+    report(
+        "bad header, good cookie",
+        lambda: auth_wrapper_before(token, invalid_header),
+        lambda: handler.auth_wrapper(token, invalid_header),
+    )
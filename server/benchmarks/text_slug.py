@@ -0,0 +1,76 @@
+"""
+gen_slug over post titles, before and after the str.translate engine and LRU cache
+Usage:
+    cd server && python benchmarks/text_slug.py
+"""
+
+# default
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# libraries
+from pyheck import kebab
+
+# local
+from utils.text_convertion import gen_slug
+from utils.text_convertion.language import (
+    convert_text_to_standard_type,
+    vietnamese_name_convertions,
+)
+
+NUMBER = 200
+
+# post titles of news.betterme.dev
+TITLES = [
+    "[HÀ NỘI] TUYỂN TÌNH NGUYỆN VIÊN CHƯƠNG TRÌNH MÙA HÈ XANH 2024",
+    "Học bổng toàn phần Chính phủ Hungary Stipendium Hungaricum 2025",
+    "[TP.HCM] Câu lạc bộ Tiếng Anh Speak Up tuyển thành viên Gen 8",
+    "Cuộc thi Khởi nghiệp Sinh viên Đổi mới Sáng tạo - SV.STARTUP 2024",
+    "[ONLINE] Dự án Gieo Chữ tuyển tình nguyện viên dạy học cho trẻ em vùng cao",
+    "Học bổng Chevening 2025-2026 của Chính phủ Anh dành cho sinh viên Việt Nam",
+    "[ĐÀ NẴNG] Tuyển Cộng tác viên Truyền thông cho Lễ hội Pháo hoa Quốc tế",
+    "Chương trình Trao đổi Văn hóa Nhật Bản JENESYS 2024 dành cho học sinh THPT",
+    "Ngày hội Việc làm Thực tập sinh 2024 - Đại học Bách khoa Hà Nội",
+    "[CẦN THƠ] Chiến dịch Xuân Tình Nguyện - Tết Sum Vầy 2025",
+    "Cuộc thi Viết Thư Quốc tế UPU lần thứ 53: Hãy viết một lá thư về đại dương",
+    "Học bổng Thạc sĩ Erasmus Mundus ngành Khoa học Dữ liệu 2025",
+    "[HUẾ] Tuyển tình nguyện viên Festival Huế 2024 - Di sản văn hóa với hội nhập",
+    "Khóa học miễn phí Kỹ năng Lãnh đạo cho Thanh niên - YSEALI Academy",
+    "Cuộc thi Ý tưởng Xanh vì Môi trường - Green Idea Contest 2024",
+    "[REMOTE] Tuyển Thực tập sinh Thiết kế Đồ họa (Graphic Design Intern)",
+]
+# titles repeat across pages, related posts and SSR of the same page
+CORPUS = TITLES * 8
+
+
+def gen_slug_before(s: str) -> str:
+    s = s.lower()
+    s = "".join(
+        [
+            vietnamese_name_convertions[x] if x in vietnamese_name_convertions.keys() else x
+            for x in s
+        ]
+    )
+    return kebab(s)
+
+
+def gen_slug_uncached(s: str) -> str:
+    return kebab(convert_text_to_standard_type(s))
+
+
+def report(name, func):
+    total_us = timeit.timeit(lambda: [func(title) for title in CORPUS], number=NUMBER)
+    per_title_us = total_us / NUMBER / len(CORPUS) * 1e6
+    print(f"{name:<24} {per_title_us:7.2f}us per title")
+    return per_title_us
+
+
+if __name__ == "__main__":
+    assert all(gen_slug_before(title) == gen_slug(title) for title in TITLES)
+    before_us = report("before", gen_slug_before)
+    report("str.translate", gen_slug_uncached)
+    after_us = report("str.translate + cache", gen_slug)
+    print(f"x{before_us / after_us:.1f}")
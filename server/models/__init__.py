@@ -1,5 +1,17 @@
-import beanie
+import asyncio
+import datetime
+import time
+import traceback
+from typing import Callable, List, Optional
+
+from beanie.odm.utils.init import Initializer
+from beanie.odm.utils.pydantic import get_model_fields
+from beanie.odm.utils.typing import get_index_attributes
+from bson import ObjectId
+
 from base.database.mongodb import client
+from base.settings import settings, IndexBuildEnum
+from utils.index_audit import QueryShape
 
 from .users import Users, UserSettings, UserRoleEnum
 
@@ -7,6 +19,7 @@ from .pomodoro.todolist import TodoList
 from .pomodoro.tasks import Tasks
 from .pomodoro.taskcategories import TaskCategories
 from .pomodoro.pomodoros import Pomodoros, PomodoroStatusEnum
+from .pomodoro.study_time_rollups import StudyTimeRollups, RollupSourceEnum
 
 # from .pomodoro.aichatchannels import ChatChannels, Chat, SenderEnum
 from .pomodoro.pomodoro_rooms import PomodoroRooms
@@ -15,6 +28,7 @@ from .news.posts import Posts, FacebookPostInfo, OtherPostInfo
 from .news.draft_posts import DraftPosts
 from .news.secret_keys import SecretKeys
 from .news.shorten_links import ShortenLinks
+from .news.related_posts import RelatedPosts
 
 from .discord.users import Users as DiscordUsers
 from .discord.user_daily_study_time import UserDailyStudyTimes
@@ -26,6 +40,7 @@ pomodoro_document_models = [
     Tasks,
     TaskCategories,
     Pomodoros,
+    StudyTimeRollups,
     PomodoroRooms,
     # ChatChannels,
 ]
@@ -34,21 +49,144 @@ news_document_models = [
     DraftPosts,
     SecretKeys,
     ShortenLinks,
+    RelatedPosts,
 ]
 discord_document_models = [DiscordUsers, UserDailyStudyTimes]
 
+# hot queries checked by `python scripts.py audit_indexes`
+query_shapes = [
+    QueryShape("last pomodoro of user", Pomodoros, {"user_id": ""}, [("start_at", -1)]),
+    QueryShape("pomodoros of user", Pomodoros, {"user_id": ""}, [("_id", -1)]),
+    QueryShape(
+        "completed pomodoros of user in range",
+        Pomodoros,
+        {
+            "status": PomodoroStatusEnum.COMPLETED.value,
+            "user_id": "",
+            "start_at": {"$gte": datetime.datetime(2025, 1, 1)},
+        },
+    ),
+    QueryShape("tasks of user", Tasks, {"user_id": ""}, [("_id", -1)]),
+    QueryShape("todo list of user", TodoList, {"user_id": ""}, [("index", 1)]),
+    QueryShape("task categories of user", TaskCategories, {"user.$id": ObjectId()}),
+    QueryShape("settings of user", UserSettings, {"user.$id": ObjectId()}),
+    QueryShape(
+        "study time rollups of owner",
+        StudyTimeRollups,
+        {
+            "source": RollupSourceEnum.POMODORO.value,
+            "owner_id": "",
+            "period_start": {"$gte": datetime.datetime(2025, 1, 1)},
+        },
+        [("period_start", 1)],
+    ),
+    QueryShape(
+        "daily study time of discord user",
+        UserDailyStudyTimes,
+        {"user_discord_id": 0, "date": {"$gte": datetime.datetime(2025, 1, 1)}},
+    ),
+    QueryShape("shorten link by name", ShortenLinks, {"link_name": ""}),
+    QueryShape("related posts of post", RelatedPosts, {"post_id": ObjectId()}),
+    QueryShape(
+        "posts of tags not expired",
+        Posts,
+        {"tags": "", "deadline": {"$not": {"$lt": datetime.datetime(2025, 1, 1)}}},
+        [("_id", -1)],
+    ),
+]
 
-async def connect_db():
-    await beanie.init_beanie(
-        database=client.betterme_study,
-        document_models=pomodoro_document_models,
-    )
-    await beanie.init_beanie(
-        database=client.betterme_news,
-        document_models=news_document_models,
+
+# database name -> document models
+databases = {
+    "betterme_study": pomodoro_document_models,
+    "betterme_news": news_document_models,
+    "discord_betterme": discord_document_models,
+}
+# keep a reference, a task without one can be garbage collected
+index_build_task: Optional[asyncio.Task] = None
+
+
+async def init_database(name: str, document_models: list, skip_indexes: bool) -> Initializer:
+    start = time.perf_counter()
+    initializer = Initializer(
+        database=client[name],
+        document_models=document_models,
+        skip_indexes=skip_indexes,
     )
-    await beanie.init_beanie(
-        database=client.discord_betterme,
-        document_models=discord_document_models,
+    await initializer
+    print(f"  {name}: {(time.perf_counter() - start) * 1000:.0f}ms")
+    return initializer
+
+
+def has_unique_index(document_model) -> bool:
+    """
+    Whether a model declares a unique index, in Settings.indexes or with Indexed(unique=True)
+    """
+    # Settings.indexes are wrapped in IndexModelField by init_beanie
+    for index in document_model.get_settings().indexes or []:
+        if index.index.document.get("unique"):
+            return True
+    for field in get_model_fields(document_model).values():
+        index_attributes = get_index_attributes(field)
+        if index_attributes and index_attributes[1].get("unique"):
+            return True
+    return False
+
+
+async def build_indexes(
+    initializers: List[Initializer], include: Callable[[type], bool] = lambda _: True
+):
+    """
+    Build indexes of every included model, raise once all models are tried when any build
+    failed (e.g. a unique index over duplicated data), the queries of that model run unindexed
+    """
+    start = time.perf_counter()
+    failed_models = []
+    for initializer in initializers:
+        for document_model in initializer.inited_classes:
+            if not include(document_model):
+                continue
+            try:
+                await initializer.init_indexes(document_model)
+            except Exception as e:
+                print(f"Build indexes of {document_model.__name__} error: {e}")
+                failed_models.append(document_model.__name__)
+    if failed_models:
+        raise RuntimeError(f"Indexes of {', '.join(failed_models)} are not built")
+    print(f"Built indexes in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def report_index_build(task: asyncio.Task):
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error:
+        print(f"!!! DEFERRED INDEX BUILD FAILED: {error}")
+        traceback.print_exception(error)
+
+
+async def connect_db(index_build: str = settings.DB_INDEX_BUILD):
+    """
+    Init beanie for every database concurrently
+    Args:
+        index_build: IndexBuildEnum value, when indexes are created
+    """
+    global index_build_task
+    start = time.perf_counter()
+    initializers = await asyncio.gather(
+        *(
+            init_database(
+                name, document_models, skip_indexes=index_build != IndexBuildEnum.STARTUP.value
+            )
+            for name, document_models in databases.items()
+        )
     )
-    print("Connected to db")
+    print(f"Connected to db in {(time.perf_counter() - start) * 1000:.0f}ms")
+    if index_build == IndexBuildEnum.DEFERRED.value:
+        # unique indexes guard writes (e.g. shorten link names), serving before they exist
+        # lets duplicates in, so only the other indexes are left to the background task
+        await build_indexes(initializers, has_unique_index)
+        index_build_task = asyncio.create_task(
+            build_indexes(initializers, lambda document_model: not has_unique_index(document_model))
+        )
+        index_build_task.add_done_callback(report_index_build)
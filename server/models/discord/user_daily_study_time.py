@@ -5,12 +5,12 @@ from typing import List, Optional
 import pymongo
 
 # lib
-from beanie import Document, Indexed
+from beanie import Document, Indexed, Insert, Replace, Save, SaveChanges, Update, after_event
 from pydantic import validator
-from cache import AsyncTTL
 
 # local
 from schemas.user_daily_study_time import UserStatsGetResponse, DataUserDailyStudyTime
+from ..pomodoro.study_time_rollups import RollupSourceEnum, StudyTimeRollups
 
 
 class UserDailyStudyTimes(Document):
@@ -54,8 +54,39 @@ class UserDailyStudyTimes(Document):
             raise ValueError("Study time length must equal 24")
         return value
 
+    ### Events
+    @after_event(Insert, Replace, Save, SaveChanges, Update)
+    async def update_study_time_rollups(self):
+        await StudyTimeRollups.set_daily_study_time(
+            self.user_discord_id, self.date, sum(self.study_time)
+        )
+
+    @staticmethod
+    async def sync_study_time_rollups(user_discord_id: int) -> None:
+        """
+        Catch up study time rollups of a user with days written outside this ODM
+        (the Discord bot writes this collection directly, Beanie events are not fired)
+        Days from the last rolled up day are read again, the current day keeps changing
+        after it was rolled up, all of them are upserted in one bulk write
+        """
+        queries = {"user_discord_id": user_discord_id}
+        last_day = await StudyTimeRollups.get_last_period_start(
+            RollupSourceEnum.DISCORD, str(user_discord_id)
+        )
+        if last_day:
+            queries["date"] = {"$gte": last_day}
+        daily_study_times = UserDailyStudyTimes.get_pymongo_collection().find(
+            queries, {"date": 1, "study_time": 1}
+        )
+        await StudyTimeRollups.set_daily_study_times(
+            user_discord_id,
+            {
+                daily_study_time["date"]: sum(daily_study_time["study_time"])
+                async for daily_study_time in daily_study_times
+            },
+        )
+
     @staticmethod
-    @AsyncTTL(time_to_live=60)
     async def get_user_study_time_stats(
         user_discord_id: int,
         from_date: Optional[datetime.datetime] = None,
@@ -4,7 +4,8 @@ from typing import Optional, List, Any, Tuple
 
 
 # libraries
-from beanie import Document, Link, Insert, after_event
+import pymongo
+from beanie import Document, Link, Insert, after_event, before_event
 from fastapi import HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field, field_validator
 
@@ -23,6 +24,22 @@ from services.discord_bot.news import send_news, send_noti_to_subcribers
 # from services.tebi import upload_image
 from utils.text_convertion import gen_slug
 from utils.time_modules import vn_now
+from utils.counters import BufferedCounter
+from base.settings import settings
+
+
+def to_deadline(value: Any) -> Optional[datetime.datetime]:
+    """ISO date string/date of a deadline to the native datetime stored in Posts.deadline"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return datetime.datetime.combine(value, datetime.time())
 
 
 class FacebookPostInfo(BaseModel):
@@ -45,6 +62,8 @@ class Posts(Document):
 
     # content
     title: str
+    # generated from title on insert/title update, backfill: python scripts.py backfill_post_slugs
+    slug: str = ""
     description: str
     thumbnail_img: Optional[str] = None
     banner_img: Optional[str] = None
@@ -53,6 +72,9 @@ class Posts(Document):
     author_link: Optional[str] = None
     # TODO: convert this to primary fields
     other_information: Optional[OtherPostInfo] = None
+    # other_information.deadline as a native date (indexed), set on insert/update
+    # backfill: python scripts.py backfill_post_deadlines
+    deadline: Optional[datetime.datetime] = None
     view: Optional[int] = Field(default=1, gt=0)
     tags: Optional[List[str]] = []
 
@@ -62,11 +84,26 @@ class Posts(Document):
 
     class Settings:
         validate_on_save = True
-        # only use cache in user api
-        # TODO: disable cache in admin router
-        use_cache = True
-        cache_expiration_time = datetime.timedelta(seconds=60)
-        cache_capacity = 100
+        # no beanie query cache: public reads are cached as serialized responses
+        # (routers/v2/posts/crud.py post_response_cache), invalidated by admin writes
+        indexes = [
+            # posts of tags (multikey) not expired, newest first
+            # equality, sort, range order: the index gives the _id order, deadline is
+            # filtered in the index scan, no in-memory sort
+            pymongo.IndexModel(
+                [
+                    ("tags", pymongo.ASCENDING),
+                    ("_id", pymongo.DESCENDING),
+                    ("deadline", pymongo.ASCENDING),
+                ],
+                name="tags_id_deadline_idx",
+            ),
+            # expired posts (deadline range)
+            pymongo.IndexModel(
+                [("deadline", pymongo.ASCENDING), ("_id", pymongo.DESCENDING)],
+                name="deadline_id_idx",
+            ),
+        ]
 
     ### Validate
     # TODO: check if working or not
@@ -99,29 +136,28 @@ class Posts(Document):
                             }
                         },
                     )
-                # TODO: fix this
                 elif pfield == "match_is_expired" and params.match_is_expired is not None:
-                    now = vn_now().date()
+                    today = to_deadline(vn_now().date())
                     if params.match_is_expired:
-                        find_queries["other_information.deadline"] = {"$lt": now.isoformat(), "$ne": None}
+                        # null/missing deadline are out of the date range bounds
+                        find_queries["deadline"] = {"$lt": today}
                     else:
-                        find_queries["$or"] = [
-                            {"other_information.deadline": {"$gte": now.isoformat()}},
-                            {"other_information.deadline": None},
-                            {"other_information": None},
-                        ]
+                        # one index range (dates from today + null/missing), no $or
+                        find_queries["deadline"] = {"$not": {"$lt": today}}
                 elif pfield.startswith("match_"):
                     match_values = getattr(params, pfield)
                     if match_values:
-                        find_queries[pfield.replace("match_", "")] = {
-                            "$elemMatch": {"$in": match_values.split(",")}
-                        }
+                        match_values = match_values.split(",")
+                        # equality/$in on a multikey index
+                        find_queries[pfield.replace("match_", "")] = (
+                            match_values[0] if len(match_values) == 1 else {"$in": match_values}
+                        )
         return find_queries, agg_queries
 
     ### Methods
-    async def increase_view(self):
-        self.view += 1
-        await self.save()
+    def increase_view(self):
+        # coalesced in memory, flushed with $inc every COUNTER_FLUSH_INTERVAL
+        post_view_counter.increment(self.id)
 
     @staticmethod
     async def create_post(
@@ -201,6 +237,20 @@ class Posts(Document):
         # return post
 
     ### Events
+    @before_event(Insert)
+    def set_deadline(self):
+        self.deadline = to_deadline(
+            self.other_information.deadline if self.other_information else None
+        )
+
+    @before_event(Insert)
+    def set_slug(self):
+        if not self.slug:
+            self.slug = gen_slug(self.title)
+
     @after_event(Insert)
     async def save_id_to_draft_post(self):
         pass
+
+
+post_view_counter = BufferedCounter(Posts, "view", flush_interval=settings.COUNTER_FLUSH_INTERVAL)
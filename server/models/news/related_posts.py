@@ -0,0 +1,28 @@
+import datetime
+from typing import List
+
+import pymongo
+from beanie import Document, Indexed, PydanticObjectId
+from pydantic import Field
+
+from utils.time_modules import vn_now
+
+
+class RelatedPosts(Document):
+    """
+    Precomputed related posts of a post, ranked by tag overlap then recency
+    Refreshed on post create/update/delete, see routers/v2/posts/crud.refresh_related_posts
+    """
+
+    post_id: Indexed(PydanticObjectId, unique=True)
+    # tags of the post, to find the snapshots a created/updated post belongs to
+    tags: List[str] = []
+    # post list items (PostListProject fields) with their tag overlap, best first
+    related: List[dict] = []
+    updated_at: datetime.datetime = Field(default_factory=vn_now)
+
+    class Settings:
+        indexes = [
+            pymongo.IndexModel([("tags", pymongo.ASCENDING)], name="tags_idx"),
+            pymongo.IndexModel([("related.id", pymongo.ASCENDING)], name="related_id_idx"),
+        ]
@@ -1,14 +1,14 @@
 import datetime
 from typing import Optional
 
-from beanie import Document
+from beanie import Document, Indexed
 from pydantic import Field
 
 from utils.time_modules import vn_now
 
 
 class ShortenLinks(Document):
-    link_name: str
+    link_name: Indexed(str, unique=True)
     redirect_link: str
     access_count: int = Field(default=0)
     created_at: datetime.datetime = Field(default_factory=vn_now)
@@ -1,18 +1,23 @@
+import pymongo
 from pydantic import Field
 from beanie import Document, before_event, Insert
 from typing import Optional, List
 import datetime
 from datetime import timedelta
-from bson.objectid import ObjectId
 from enum import Enum
 from fastapi import HTTPException
 
 # local
 from ..users import UserSettings
+from .study_time_rollups import StudyTimeRollups
 
 from utils.time_modules import vn_now
 
 
+# upper bound of Pomodoros.duration (seconds)
+MAX_DURATION = 180 * 60
+
+
 class PomodoroStatusEnum(str, Enum):
     STARTED = "STARTED"
     COMPLETED = "COMPLETED"
@@ -21,7 +26,7 @@ class PomodoroStatusEnum(str, Enum):
 
 class Pomodoros(Document):
     user_id: str
-    duration: Optional[int] = Field(ge=5 * 60, lt=180 * 60, default=None)
+    duration: Optional[int] = Field(ge=5 * 60, lt=MAX_DURATION, default=None)
     # tasks: Optional[List[Link[TodoList]]]
     tasks: Optional[List[str]] = Field(max_items=10, default=[])
 
@@ -31,17 +36,29 @@ class Pomodoros(Document):
     status: Optional[PomodoroStatusEnum] = PomodoroStatusEnum.STARTED
 
     ### Settings
-    # class Settings:
-    #     use_cache = True
-    #     cache_expiration_time = datetime.timedelta(seconds=1)
-    #     cache_capacity = 100
+    class Settings:
+        indexes = [
+            # last pomodoro of a user, daily minutes of a user
+            pymongo.IndexModel(
+                [("user_id", pymongo.ASCENDING), ("start_at", pymongo.DESCENDING)],
+                name="user_id_start_at_idx",
+            ),
+            # paginated list of a user (BaseCRUD.get_list)
+            pymongo.IndexModel(
+                [("user_id", pymongo.ASCENDING), ("_id", pymongo.DESCENDING)],
+                name="user_id_id_idx",
+            ),
+        ]
+        # use_cache = True
+        # cache_expiration_time = datetime.timedelta(seconds=1)
+        # cache_capacity = 100
 
     ### Events
     @before_event(Insert)
     # start_pomodoro_section
     async def set_time_and_start_time(self):
-        user_setting = await UserSettings.find_one(UserSettings.user.id == ObjectId(self.user_id))
-        pomodoro_study_time = user_setting.pomodoro_settings.pomodoro_study_time
+        user_setting = await UserSettings.get_by_user_id(self.user_id)
+        pomodoro_study_time = user_setting["pomodoro_settings"]["pomodoro_study_time"]
         self.duration = pomodoro_study_time
         self.start_at = vn_now()
 
@@ -58,9 +75,17 @@ class Pomodoros(Document):
             self.status == PomodoroStatusEnum.STARTED
             and self.start_at + timedelta(seconds=self.duration - 60) <= vn_now()
         ):
-            await self.set(
-                {Pomodoros.end_at: vn_now(), Pomodoros.status: PomodoroStatusEnum.COMPLETED}
+            end_at = vn_now()
+            # conditional on STARTED, concurrent ends complete (and roll up) only once
+            result = await Pomodoros.get_pymongo_collection().update_one(
+                {"_id": self.id, "status": PomodoroStatusEnum.STARTED.value},
+                {"$set": {"end_at": end_at, "status": PomodoroStatusEnum.COMPLETED.value}},
             )
+            if result.modified_count != 1:
+                raise HTTPException(status_code=400, detail="Invalid pomodoro section")
+            self.end_at = end_at
+            self.status = PomodoroStatusEnum.COMPLETED
+            await StudyTimeRollups.add_pomodoro(self)
         else:
             raise HTTPException(status_code=400, detail="Invalid pomodoro section")
 
@@ -76,3 +101,136 @@ class Pomodoros(Document):
 
     def check_available_to_create(self) -> bool:
         return self.status == PomodoroStatusEnum.COMPLETED
+
+    @classmethod
+    async def daily_minutes(
+        cls,
+        user_id: Optional[str] = None,
+        from_date: Optional[datetime.datetime] = None,
+        to_date: Optional[datetime.datetime] = None,
+    ) -> List[dict]:
+        """
+        Completed study minutes and pomodoro count per user per day, computed in MongoDB
+        - A section passing midnight is split to both days
+        - A pomodoro is counted in the day it started
+        Returns:
+            [{"user_id": str, "date": datetime, "study_time": float, "pomodoro_count": int}]
+            sorted by user_id, date
+        """
+        queries = {
+            "status": PomodoroStatusEnum.COMPLETED.value,
+            "start_at": {"$ne": None},
+            "duration": {"$ne": None},
+        }
+        if user_id:
+            queries["user_id"] = user_id
+        # sections started before from_date can still pass midnight into it
+        if from_date:
+            queries["start_at"]["$gte"] = from_date - timedelta(seconds=MAX_DURATION)
+        if to_date:
+            queries["start_at"]["$lte"] = to_date
+
+        day_queries = {"minutes": {"$gt": 0}}
+        if from_date:
+            day_queries.setdefault("date", {})["$gte"] = from_date
+        if to_date:
+            day_queries.setdefault("date", {})["$lte"] = to_date
+
+        pipeline = [
+            {"$match": queries},
+            {
+                "$project": {
+                    "_id": 0,
+                    "user_id": 1,
+                    "start_at": 1,
+                    "end_at": {"$add": ["$start_at", {"$multiply": ["$duration", 1000]}]},
+                    "day": {"$dateTrunc": {"date": "$start_at", "unit": "day"}},
+                }
+            },
+            # one element per day the section touches
+            {
+                "$set": {
+                    "days": {
+                        "$map": {
+                            "input": {
+                                "$range": [
+                                    0,
+                                    {
+                                        "$add": [
+                                            {
+                                                "$dateDiff": {
+                                                    "startDate": "$day",
+                                                    "endDate": "$end_at",
+                                                    "unit": "day",
+                                                }
+                                            },
+                                            1,
+                                        ]
+                                    },
+                                ]
+                            },
+                            "as": "index",
+                            "in": {
+                                "index": "$$index",
+                                "date": {
+                                    "$dateAdd": {
+                                        "startDate": "$day",
+                                        "unit": "day",
+                                        "amount": "$$index",
+                                    }
+                                },
+                            },
+                        }
+                    }
+                }
+            },
+            {"$unwind": "$days"},
+            {
+                "$project": {
+                    "user_id": 1,
+                    "date": "$days.date",
+                    "minutes": {
+                        "$divide": [
+                            {
+                                "$subtract": [
+                                    {
+                                        "$min": [
+                                            "$end_at",
+                                            {
+                                                "$dateAdd": {
+                                                    "startDate": "$days.date",
+                                                    "unit": "day",
+                                                    "amount": 1,
+                                                }
+                                            },
+                                        ]
+                                    },
+                                    {"$max": ["$start_at", "$days.date"]},
+                                ]
+                            },
+                            60 * 1000,
+                        ]
+                    },
+                    "count": {"$cond": [{"$eq": ["$days.index", 0]}, 1, 0]},
+                }
+            },
+            {"$match": day_queries},
+            {
+                "$group": {
+                    "_id": {"user_id": "$user_id", "date": "$date"},
+                    "study_time": {"$sum": "$minutes"},
+                    "pomodoro_count": {"$sum": "$count"},
+                }
+            },
+            {"$sort": {"_id.user_id": 1, "_id.date": 1}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "user_id": "$_id.user_id",
+                    "date": "$_id.date",
+                    "study_time": 1,
+                    "pomodoro_count": 1,
+                }
+            },
+        ]
+        return await cls.aggregate(pipeline).to_list()
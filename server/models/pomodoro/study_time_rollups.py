@@ -0,0 +1,304 @@
+# default
+import datetime
+from collections import defaultdict
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional
+
+# libraries
+import pymongo
+from beanie import Document
+from pydantic import Field
+from pymongo import UpdateOne
+
+# local
+from base.settings import settings
+from utils.cache import SharedCache
+
+
+class RollupSourceEnum(str, Enum):
+    # UserDailyStudyTimes, owner_id = user_discord_id
+    DISCORD = "discord"
+    # completed Pomodoros, owner_id = user_id
+    POMODORO = "pomodoro"
+
+
+class DailyStudyTime(NamedTuple):
+    period_start: datetime.datetime
+    study_time: float
+    pomodoro_count: int
+
+
+# daily series per owner, cached by whole years, invalidated when the owner rollups change
+daily_series_cache = SharedCache(
+    "study_time_rollups",
+    max_size=4096,
+    ttl=settings.STATISTICS_CACHE_TTL,
+    redis_url=settings.REDIS_URL,
+)
+
+
+def get_day_start(day: datetime.datetime) -> datetime.datetime:
+    """
+    Start of the day bucket that a moment belongs to
+    """
+    return datetime.datetime(day.year, day.month, day.day)
+
+
+def split_minutes_by_day(
+    start_at: datetime.datetime, duration: int
+) -> Dict[datetime.datetime, float]:
+    """
+    Split a study section into minutes per day (a section can pass midnight)
+    Example:
+        start_at=2025-01-01 23:50, duration=25*60
+        -> {2025-01-01: 10.0, 2025-01-02: 15.0}
+    """
+    minutes_by_day = {}
+    end_at = start_at + datetime.timedelta(seconds=duration)
+    current_time = start_at
+    while current_time < end_at:
+        day_start = current_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day_start + datetime.timedelta(days=1)
+        period_end = min(end_at, day_end)
+        minutes_by_day[day_start] = (period_end - current_time).total_seconds() / 60
+        current_time = day_end
+    return minutes_by_day
+
+
+class StudyTimeRollups(Document):
+    """
+    Pre-aggregated study time per owner per day
+    Kept up to date when a pomodoro completes and when daily study time is written
+    through this ODM, days written by the Discord bot are caught up on read
+    (see UserDailyStudyTimes.sync_study_time_rollups)
+    """
+
+    source: RollupSourceEnum
+    owner_id: str
+    # start of the day, statistics need day granularity (streaks, per-day items),
+    # month/year totals are summed from the cached day series
+    period_start: datetime.datetime
+    # minutes
+    study_time: float = Field(default=0)
+    pomodoro_count: int = Field(default=0)
+
+    class Settings:
+        indexes = [
+            pymongo.IndexModel(
+                [
+                    ("source", pymongo.ASCENDING),
+                    ("owner_id", pymongo.ASCENDING),
+                    ("period_start", pymongo.ASCENDING),
+                ],
+                unique=True,
+                name="source_owner_day_unique_idx",
+            ),
+        ]
+
+    @staticmethod
+    def _cache_namespace(source: RollupSourceEnum, owner_id: str) -> str:
+        return f"{source.value}:{owner_id}"
+
+    @staticmethod
+    def _filter(
+        source: RollupSourceEnum,
+        owner_id: str,
+        period_start: datetime.datetime,
+    ) -> dict:
+        return {
+            "source": source.value,
+            "owner_id": owner_id,
+            "period_start": period_start,
+        }
+
+    @staticmethod
+    def build_pomodoro_increments(pomodoros) -> Dict[str, Dict[datetime.datetime, List[float]]]:
+        """
+        Sum completed pomodoros into {user_id: {period_start: [minutes, count]}}
+        """
+        increments = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        for pomodoro in pomodoros:
+            if not pomodoro.start_at or not pomodoro.duration:
+                continue
+            user_increments = increments[pomodoro.user_id]
+            for day, minutes in split_minutes_by_day(pomodoro.start_at, pomodoro.duration).items():
+                user_increments[day][0] += minutes
+            # count the pomodoro in the bucket of the day it started
+            user_increments[get_day_start(pomodoro.start_at)][1] += 1
+        return increments
+
+    @staticmethod
+    def build_daily_minutes_increments(
+        daily_minutes,
+    ) -> Dict[str, Dict[datetime.datetime, List[float]]]:
+        """
+        Sum Pomodoros.daily_minutes rows into {user_id: {period_start: [minutes, count]}}
+        """
+        increments = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        for row in daily_minutes:
+            user_increments = increments[row["user_id"]]
+            period_start = get_day_start(row["date"])
+            user_increments[period_start][0] += row["study_time"]
+            user_increments[period_start][1] += row["pomodoro_count"]
+        return increments
+
+    @staticmethod
+    def build_daily_study_time_increments(
+        daily_study_times,
+    ) -> Dict[str, Dict[datetime.datetime, List[float]]]:
+        """
+        Sum UserDailyStudyTimes into {user_discord_id: {period_start: [minutes, 0]}}
+        """
+        increments = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        for daily_study_time in daily_study_times:
+            user_increments = increments[str(daily_study_time.user_discord_id)]
+            period_start = get_day_start(daily_study_time.date)
+            user_increments[period_start][0] += sum(daily_study_time.study_time)
+        return increments
+
+    @classmethod
+    async def write_increments(
+        cls,
+        source: RollupSourceEnum,
+        increments: Dict[str, Dict[datetime.datetime, List[float]]],
+        operator: str = "$inc",
+    ) -> None:
+        """
+        Upsert increments from build_*_increments
+        operator: $inc for incremental update, $set for rebuild
+        """
+        requests = [
+            UpdateOne(
+                cls._filter(source, owner_id, period_start),
+                {operator: {"study_time": minutes, "pomodoro_count": count}},
+                upsert=True,
+            )
+            for owner_id, user_increments in increments.items()
+            for period_start, (minutes, count) in user_increments.items()
+        ]
+        if requests:
+            await cls.get_pymongo_collection().bulk_write(requests, ordered=False)
+            await daily_series_cache.invalidate(
+                *(cls._cache_namespace(source, owner_id) for owner_id in increments)
+            )
+
+    @classmethod
+    async def add_pomodoro(cls, pomodoro) -> None:
+        """
+        Add a completed pomodoro to its day buckets
+        """
+        await cls.write_increments(
+            RollupSourceEnum.POMODORO, cls.build_pomodoro_increments([pomodoro])
+        )
+
+    @classmethod
+    async def set_daily_study_times(
+        cls, user_discord_id: int, study_times: Dict[datetime.datetime, int]
+    ) -> None:
+        """
+        Set study time of days in one bulk write: {date: study_time}
+        """
+        owner_id = str(user_discord_id)
+        requests = [
+            UpdateOne(
+                cls._filter(RollupSourceEnum.DISCORD, owner_id, get_day_start(date)),
+                {"$set": {"study_time": study_time}, "$setOnInsert": {"pomodoro_count": 0}},
+                upsert=True,
+            )
+            for date, study_time in study_times.items()
+        ]
+        if not requests:
+            return
+        result = await cls.get_pymongo_collection().bulk_write(requests, ordered=False)
+        if result.modified_count or result.upserted_count:
+            await daily_series_cache.invalidate(
+                cls._cache_namespace(RollupSourceEnum.DISCORD, owner_id)
+            )
+
+    @classmethod
+    async def set_daily_study_time(
+        cls, user_discord_id: int, date: datetime.datetime, study_time: int
+    ) -> None:
+        """
+        Set study time of a day
+        """
+        await cls.set_daily_study_times(user_discord_id, {date: study_time})
+
+    @classmethod
+    async def get_last_period_start(
+        cls, source: RollupSourceEnum, owner_id: str
+    ) -> Optional[datetime.datetime]:
+        """
+        Start of the latest day bucket of an owner
+        """
+        rollup = await cls.get_pymongo_collection().find_one(
+            {"source": source.value, "owner_id": owner_id},
+            {"period_start": 1},
+            sort=[("period_start", pymongo.DESCENDING)],
+        )
+        return rollup["period_start"] if rollup else None
+
+    @classmethod
+    async def get_series(
+        cls,
+        source: RollupSourceEnum,
+        owner_id: str,
+        from_date: Optional[datetime.datetime] = None,
+        to_date: Optional[datetime.datetime] = None,
+    ) -> List["StudyTimeRollups"]:
+        """
+        Buckets of an owner sorted by period_start
+        """
+        queries = {"source": source.value, "owner_id": owner_id}
+        date_queries = {}
+        if from_date:
+            date_queries["$gte"] = from_date
+        if to_date:
+            date_queries["$lte"] = to_date
+        if date_queries:
+            queries["period_start"] = date_queries
+        return await cls.find(queries).sort([("period_start", pymongo.ASCENDING)]).to_list()
+
+    @classmethod
+    async def get_daily_series(
+        cls,
+        source: RollupSourceEnum,
+        owner_id: str,
+        from_date: Optional[datetime.datetime] = None,
+        to_date: Optional[datetime.datetime] = None,
+    ) -> List[DailyStudyTime]:
+        """
+        Day buckets of an owner sorted by date, served from daily_series_cache
+        The range is widened to whole years before caching, so any range in the same
+        years share one cache entry, then trimmed back to [from_date, to_date]
+        """
+        window_from = datetime.datetime(from_date.year, 1, 1) if from_date else None
+        window_to = datetime.datetime(to_date.year + 1, 1, 1) if to_date else None
+        window_key = (
+            f"{window_from.year if window_from else '*'}-{window_to.year if window_to else '*'}"
+        )
+        namespaces = [cls._cache_namespace(source, owner_id)]
+
+        series = await daily_series_cache.get(namespaces, window_key)
+        if series is None:
+            rollups = await cls.get_series(
+                source,
+                owner_id,
+                from_date=window_from,
+                to_date=window_to - datetime.timedelta(microseconds=1) if window_to else None,
+            )
+            series = [
+                [rollup.period_start.isoformat(), rollup.study_time, rollup.pomodoro_count]
+                for rollup in rollups
+            ]
+            await daily_series_cache.set(namespaces, window_key, series)
+
+        daily_series = []
+        for period_start, study_time, pomodoro_count in series:
+            period_start = datetime.datetime.fromisoformat(period_start)
+            if from_date and period_start < from_date:
+                continue
+            if to_date and period_start > to_date:
+                break
+            daily_series.append(DailyStudyTime(period_start, study_time, pomodoro_count))
+        return daily_series
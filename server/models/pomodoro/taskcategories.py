@@ -1,3 +1,4 @@
+import pymongo
 from pydantic import Field, validator
 from beanie import Document, Link
 
@@ -12,6 +13,11 @@ class TaskCategories(Document):
     description: str = Field(max_length=1000)
     color: str = Field(max_length=10)
 
+    class Settings:
+        indexes = [
+            pymongo.IndexModel([("user.$id", pymongo.ASCENDING)], name="user_id_idx"),
+        ]
+
     @validator("color")
     def status_in_list(cls, v: str):
         if not v.startswith("#"):
@@ -1,3 +1,4 @@
+import pymongo
 from pydantic import Field, validator
 from beanie import Document
 from typing import Optional, List
@@ -32,6 +33,15 @@ class TodoList(Document):
     created_at: datetime.datetime = Field(default_factory=vn_now)
     updated_at: Optional[datetime.datetime] = None
 
+    class Settings:
+        indexes = [
+            # list of a user sorted by index
+            pymongo.IndexModel(
+                [("user_id", pymongo.ASCENDING), ("index", pymongo.ASCENDING)],
+                name="user_id_index_idx",
+            ),
+        ]
+
     # TODO: fix to enum
     @validator("necessary")
     def necessary_in_list(cls, v):
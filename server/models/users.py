@@ -1,14 +1,26 @@
 # default
+import copy
 import datetime
 from enum import Enum
 from typing import Optional, List
 
+import pymongo
+from bson.objectid import ObjectId
 from pydantic import EmailStr, ValidationError, validator, Field, BaseModel
 from beanie import Document, Link, Insert, after_event
+from beanie.odm.operators.update.general import Set
 
 # local
+from base.settings import settings
+from utils.cache import SharedCache
 from utils.time_modules import vn_now
 
+# user_id -> settings (JSON, without user), invalidated on update
+# (on every worker with REDIS_URL, otherwise other workers keep it up to unshared_ttl)
+user_settings_cache = SharedCache(
+    "user_settings", max_size=4096, ttl=600, redis_url=settings.REDIS_URL
+)
+
 
 class UserRoleEnum(str, Enum):
     OWNER = "owner"
@@ -112,3 +124,29 @@ class UserSettings(Document):
 
     visuals: Optional[UserVisualSettings] = UserVisualSettings()
     pomodoro_settings: Optional[UserPomodoroSettings] = UserPomodoroSettings()
+
+    class Settings:
+        indexes = [
+            pymongo.IndexModel([("user.$id", pymongo.ASCENDING)], name="user_id_idx"),
+        ]
+
+    @classmethod
+    async def get_by_user_id(cls, user_id: str) -> Optional[dict]:
+        """
+        Settings of a user as a JSON dict (without user), served from user_settings_cache
+        Returns a copy, callers can change it freely
+        """
+        user_setting = await user_settings_cache.get([user_id], "settings")
+        if user_setting is None:
+            db_user_setting = await cls.find_one(cls.user.id == ObjectId(user_id))
+            if not db_user_setting:
+                return None
+            user_setting = db_user_setting.model_dump(mode="json", by_alias=True, exclude={"user"})
+            await user_settings_cache.set([user_id], "settings", user_setting)
+        return copy.deepcopy(user_setting)
+
+    @classmethod
+    async def update_by_user_id(cls, user_id: str, new_user_setting: dict) -> None:
+        """Update settings of a user without reading them, then invalidate the cache"""
+        await cls.find_one(cls.user.id == ObjectId(user_id)).update(Set(new_user_setting))
+        await user_settings_cache.invalidate(user_id)
@@ -1,5 +1,9 @@
 # default
-from typing import Optional
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 from datetime import datetime, timedelta
 
 #  lib
@@ -12,14 +16,31 @@ from passlib.context import CryptContext
 #  local
 from base.settings import settings
 from models import UserRoleEnum
+from utils.cache import TTLCache
+
+# verified tokens are trusted this long (seconds) before verifying the signature again
+VERIFIED_TOKEN_TTL = 300
+
+# bcrypt work runs here, never on the event loop (bcrypt releases the GIL)
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY, thread_name_prefix="password"
+)
 
 
 class AuthHandler:
     header_security = HTTPBearer(auto_error=False)
     cookie_security = APIKeyCookie(name="Authorization", auto_error=False)
     access_key_security = APIKeyHeader(name="Authorization", auto_error=False)
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # hashes with other rounds are flagged for rehash on login
+    pwd_context = CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+    )
     secret = settings.SECRET_KEY
+    verified_tokens = TTLCache(max_size=4096, ttl=VERIFIED_TOKEN_TTL)
+
+    def __init__(self):
+        # waiting logins queue here instead of piling up in the executor
+        self._password_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
 
     def get_password_hash(self, password):
         return self.pwd_context.hash(password)
@@ -27,6 +48,27 @@ class AuthHandler:
     def verify_password(self, plain_password, hashed_password):
         return self.pwd_context.verify(plain_password, hashed_password)
 
+    async def _run_password_work(self, func, *args):
+        async with self._password_semaphore:
+            return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+
+    async def hash_password(self, password: str) -> str:
+        """get_password_hash off the event loop"""
+        return await self._run_password_work(self.pwd_context.hash, password)
+
+    async def verify_and_update_password(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password off the event loop
+        Returns:
+            (valid, new_hash), new_hash is set when the hash must be replaced
+            (e.g. BCRYPT_ROUNDS changed)
+        """
+        return await self._run_password_work(
+            self.pwd_context.verify_and_update, plain_password, hashed_password
+        )
+
     def encode_token(self, user):
         payload = {
             "exp": datetime.utcnow() + timedelta(days=30),
@@ -35,21 +77,55 @@ class AuthHandler:
         }
         return jwt.encode(payload, self.secret, algorithm="HS256")
 
-    def decode_token(self, token):
-        try:
-            payload = jwt.decode(token, self.secret, algorithms=["HS256"])
-            return payload["sub"]
-        except jwt.ExpiredSignatureError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Signature has expired"
+    def verify_token(self, token: str) -> Tuple[Optional[dict], Optional[HTTPException]]:
+        """
+        Verify a token without raising
+        Verified claims are cached by token digest until min(exp, VERIFIED_TOKEN_TTL)
+        Returns:
+            (user, None) when valid, (None, error) otherwise
+        """
+        token_digest = hashlib.sha256(token.encode()).digest()
+        payload = self.verified_tokens.get(token_digest)
+        if payload is None:
+            try:
+                payload = jwt.decode(token, self.secret, algorithms=["HS256"])
+            except jwt.ExpiredSignatureError:
+                return None, HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED, detail="Signature has expired"
+                )
+            except jwt.InvalidTokenError:
+                return None, HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+                )
+            except Exception:
+                return None, HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Server error"
+                )
+            if "sub" not in payload:
+                return None, HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+                )
+            self.verified_tokens.set(
+                token_digest,
+                payload,
+                ttl=min(payload.get("exp", float("inf")) - time.time(), VERIFIED_TOKEN_TTL),
             )
-        except jwt.InvalidTokenError:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Server error"
+        elif payload.get("exp", float("inf")) <= time.time():
+            self.verified_tokens.delete(token_digest)
+            return None, HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Signature has expired"
             )
 
+        user = payload["sub"]
+        # callers must not change the cached claims
+        return (dict(user) if isinstance(user, dict) else user), None
+
+    def decode_token(self, token):
+        user, error = self.verify_token(token)
+        if error:
+            raise error
+        return user
+
     def auth_wrapper(
         self,
         cookie_token: Optional[str] = Security(cookie_security),
@@ -58,19 +134,16 @@ class AuthHandler:
         if not header_token and not cookie_token:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorization")
 
-        # Try header verification
-        try:
-            return self.decode_token(header_token.credentials)
-        except Exception as e:
-            exception = e
-
-        # Try cookie verification
-        try:
-            return self.decode_token(cookie_token)
-        except Exception as e:
-            exception = e
+        # Header first, then cookie, the error of the last tried token is raised
+        error = None
+        for token in (header_token.credentials if header_token else None, cookie_token):
+            if not token:
+                continue
+            user, error = self.verify_token(token)
+            if error is None:
+                return user
 
-        raise exception
+        raise error
 
     # def news_admin_auth_wrapper(self, auth: HTTPAuthorizationCredentials = Security(security)):
     #     user = self.decode_token(auth.credentials)
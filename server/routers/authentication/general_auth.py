@@ -23,7 +23,7 @@ async def register(user: RegisterUser) -> RegisterUserResponse:
     if user_exist:
         raise HTTPException(status_code=400, detail="email is taken")
 
-    hashed_password = auth_handler.get_password_hash(user.password)
+    hashed_password = await auth_handler.hash_password(user.password)
     user = Users(
         email=user.email,
         password=hashed_password,
@@ -38,11 +38,19 @@ async def register(user: RegisterUser) -> RegisterUserResponse:
 async def login(user: LoginUser):
     # authorize and get JWT token
     dbuser = await Users.find_one(Users.email == user.email)
-    if not user:
+    if not dbuser:
         raise HTTPException(status_code=404, detail="User not exist")
-    elif not auth_handler.verify_password(user.password, dbuser.password):
+    if not dbuser.password:
         raise HTTPException(status_code=401, detail="Invalid email and/or password")
 
+    is_valid, new_hash = await auth_handler.verify_and_update_password(
+        user.password, dbuser.password
+    )
+    if not is_valid:
+        raise HTTPException(status_code=401, detail="Invalid email and/or password")
+    if new_hash:
+        dbuser.password = new_hash
+
     dbuser.last_logged_in_at = vn_now()
     await dbuser.save()
 
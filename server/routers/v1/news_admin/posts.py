@@ -6,6 +6,7 @@ import aiofiles
 
 # local
 from models import Posts, Users, DraftPosts, OtherPostInfo
+from models.news.posts import to_deadline
 from schemas.news_admin import (
     # params
     # payload
@@ -17,6 +18,11 @@ from schemas.news_admin import (
     ResponseStatusEnum,
 )
 from routers.authentication import auth_handler
+from routers.v2.posts.crud import (
+    invalidate_post_caches,
+    refresh_related_posts,
+    remove_related_posts,
+)
 from scrap.func import image_process
 from services.tebi import delete_image
 from services.discord_bot.news import delete_news, send_news, send_noti_to_subcribers
@@ -87,6 +93,8 @@ async def new_post(
     post.discord_post_id = discord_post_id
     await post.save()
     background_tasks.add_task(send_noti_to_subcribers, payload, False, post.id)
+    await refresh_related_posts(post)
+    await invalidate_post_caches()
     return PostCrawlersResponse(id=str(post.id))
 
 
@@ -124,10 +132,18 @@ async def patch_post(
             detail="Post not found",
         )
     update_fields = payload.model_dump(mode="json", exclude_unset=True)
+    if update_fields.get("title"):
+        update_fields["slug"] = gen_slug(update_fields["title"])
+    if "other_information" in update_fields:
+        update_fields["deadline"] = to_deadline(
+            (update_fields["other_information"] or {}).get("deadline")
+        )
     if update_fields:
         await post.set(update_fields)
         post.updated_by = await Users.get(user["id"])
         await post.save()
+        await refresh_related_posts(post)
+        await invalidate_post_caches()
 
     return
 
@@ -159,5 +175,7 @@ async def delete_post(post_id: str, user: Users = Depends(auth_handler.auth_wrap
     # await draft_post.save()
     await post.set({"draft_post.delete": str(user["id"])})
     await post.delete()
+    await remove_related_posts(post.id)
+    await invalidate_post_caches()
 
     return
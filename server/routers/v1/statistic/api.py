@@ -10,7 +10,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from routers.authentication import auth_handler
 from models import Users
 
-from models.discord.user_daily_study_time import UserDailyStudyTimes
+from models import StudyTimeRollups, RollupSourceEnum, UserDailyStudyTimes
 from schemas.user_daily_study_time import StatisticsResponse, StatisticDataItem
 
 router = APIRouter(
@@ -51,25 +51,26 @@ async def get_user_statistics(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD")
 
-    # Use your existing function to get study time stats
+    # Daily totals are pre-aggregated in study time rollups
     if user.get("discord_id"):
-        study_stats = await UserDailyStudyTimes.get_user_study_time_stats(
-            user_discord_id=user["discord_id"], from_date=start_datetime, to_date=end_datetime
+        await UserDailyStudyTimes.sync_study_time_rollups(int(user["discord_id"]))
+        daily_rollups = await StudyTimeRollups.get_daily_series(
+            RollupSourceEnum.DISCORD,
+            str(user["discord_id"]),
+            from_date=start_datetime,
+            to_date=end_datetime,
         )
     else:
         # Fallback if no discord_id
-        study_stats = None
+        daily_rollups = []
 
     # Process data by date
     data_by_date = defaultdict(lambda: {"total": 0, "sessions": 0})
 
-    # Process study time data from your function
-    if study_stats and study_stats.daily_study_time:
-        for daily_data in study_stats.daily_study_time:
-            date_key = daily_data.date.strftime("%Y-%m-%d")
-            daily_total = sum(daily_data.study_time)  # Sum of all 24 hours
-            data_by_date[date_key]["total"] = daily_total
-            data_by_date[date_key]["sessions"] = 1  # Count as one session per day
+    for daily_rollup in daily_rollups:
+        date_key = daily_rollup.period_start.strftime("%Y-%m-%d")
+        data_by_date[date_key]["total"] = daily_rollup.study_time
+        data_by_date[date_key]["sessions"] = 1  # Count as one session per day
 
     # Fill in missing dates in the range with 0 values
     if start_datetime and end_datetime:
@@ -1,6 +1,3 @@
-# default
-from bson.objectid import ObjectId
-
 # libraries
 from fastapi import APIRouter, Depends
 from beanie.odm.operators.update.general import Set
@@ -19,9 +16,7 @@ router = APIRouter(
 
 @router.get("/users/self/settings")
 async def get_user_setting(user: Users = Depends(auth_handler.auth_wrapper)):
-    user_setting = await UserSettings.find_one(UserSettings.user.id == ObjectId(user["id"]))
-    del user_setting.user
-    return user_setting
+    return await UserSettings.get_by_user_id(user["id"])
 
 
 @router.patch("/users/self/settings", status_code=204)
@@ -31,8 +26,9 @@ async def update_user_setting(
     #
     user: Users = Depends(auth_handler.auth_wrapper),
 ):
-    old_user_setting = await UserSettings.find_one(UserSettings.user.id == ObjectId(user["id"]))
-    await old_user_setting.update(Set(new_user_setting.model_dump(mode="json", exclude_none=True)))
+    await UserSettings.update_by_user_id(
+        user["id"], new_user_setting.model_dump(mode="json", exclude_none=True)
+    )
     return
 
 
@@ -1,7 +1,9 @@
 import uuid
 import json
+import time
+import asyncio
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from livekit import api
 from livekit.api import AccessToken, VideoGrants
@@ -9,12 +11,50 @@ from pydash import pick as _pick
 
 from models.pomodoro.pomodoro_rooms import PomodoroSectionSettings
 from base.settings import settings
-from base.custom.http_status import ServerError
+from base.custom.http_status import NotFound, ServerError
+
+# seconds a registry entry / the full room list is trusted without asking LiveKit
+ROOM_REGISTRY_TTL = 10
+
+
+def room_to_dict(room: api.Room) -> Dict[str, Any]:
+    """Convert a LiveKit room to the pomodoro room response."""
+    metadata = {}
+    if room.metadata:
+        try:
+            metadata = json.loads(room.metadata)
+        except json.JSONDecodeError:
+            metadata = {}
+
+    return {
+        "room_name": metadata.get("room_name", room.name),
+        "livekit_room_name": room.name,
+        "pomodoro_settings": metadata.get(
+            "pomodoro_settings", PomodoroSectionSettings().model_dump()
+        ),
+        "limit": room.max_participants,
+        "created_by": metadata.get("created_by", ""),
+        "created_at": datetime.fromtimestamp(room.creation_time / 1000)
+        if room.creation_time
+        else datetime.now(),
+        "num_participants": room.num_participants,
+    }
 
 
 class PomodoroRoomCRUD:
+    """
+    Pomodoro rooms live in LiveKit only
+    Rooms are kept in an in-process registry (livekit_room_name -> room) updated by
+    LiveKit webhooks and by this CRUD, LiveKit is asked again when an entry is older than
+    ROOM_REGISTRY_TTL
+    """
+
     def __init__(self):
         self._livekit = None
+        # livekit_room_name -> (updated_at, room)
+        self._rooms: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._rooms_listed_at: float = 0
+        self._list_lock = asyncio.Lock()
 
     @property
     def livekit(self):
@@ -24,41 +64,60 @@ class PomodoroRoomCRUD:
             )
         return self._livekit
 
+    ### Registry
+    def set_room(self, room: api.Room) -> Dict[str, Any]:
+        """Add or replace a LiveKit room in the registry."""
+        room_dict = room_to_dict(room)
+        self._rooms[room.name] = (time.monotonic(), room_dict)
+        return dict(room_dict)
+
+    def remove_room(self, livekit_room_name: str) -> None:
+        self._rooms.pop(livekit_room_name, None)
+
+    def change_num_participants(self, livekit_room_name: str, change: int) -> None:
+        item = self._rooms.get(livekit_room_name)
+        if item:
+            room = item[1]
+            room["num_participants"] = max(room["num_participants"] + change, 0)
+
+    def _get_fresh_room(self, livekit_room_name: str) -> Optional[Dict[str, Any]]:
+        item = self._rooms.get(livekit_room_name)
+        if item and time.monotonic() - item[0] < ROOM_REGISTRY_TTL:
+            return dict(item[1])
+        return None
+
+    async def _refresh_rooms(self) -> None:
+        async with self._list_lock:
+            # another request refreshed while waiting for the lock
+            if time.monotonic() - self._rooms_listed_at < ROOM_REGISTRY_TTL:
+                return
+            rooms_response = await self.livekit.room.list_rooms(api.ListRoomsRequest())
+            now = time.monotonic()
+            self._rooms = {room.name: (now, room_to_dict(room)) for room in rooms_response.rooms}
+            self._rooms_listed_at = now
+
+    async def _fetch_room(self, livekit_room_name: str) -> api.Room:
+        """Get a single room from LiveKit."""
+        rooms_response = await self.livekit.room.list_rooms(
+            api.ListRoomsRequest(names=[livekit_room_name])
+        )
+        for room in rooms_response.rooms:
+            if room.name == livekit_room_name:
+                return room
+        self.remove_room(livekit_room_name)
+        raise NotFound(detail="Room not found")
+
+    ### CRUD
     async def get_list(self, **kwargs) -> List[Dict[str, Any]]:
-        """Get list of pomodoro rooms directly from LiveKit."""
+        """Get list of pomodoro rooms from the registry, refreshed from LiveKit when stale."""
         try:
-            rooms_response = await self.livekit.room.list_rooms(api.ListRoomsRequest())
-            rooms = []
-
-            for room in rooms_response.rooms:
-                # Parse metadata from room
-                metadata = {}
-                if room.metadata:
-                    try:
-                        metadata = json.loads(room.metadata)
-                    except json.JSONDecodeError:
-                        metadata = {}
-
-                rooms.append(
-                    {
-                        "room_name": metadata.get("room_name", room.name),
-                        "livekit_room_name": room.name,
-                        "pomodoro_settings": metadata.get(
-                            "pomodoro_settings", PomodoroSectionSettings().model_dump()
-                        ),
-                        "limit": room.max_participants,
-                        "created_by": metadata.get("created_by", ""),
-                        "created_at": datetime.fromtimestamp(room.creation_time / 1000)
-                        if room.creation_time
-                        else datetime.now(),
-                        "num_participants": room.num_participants,
-                    }
-                )
-
-            return rooms
+            if time.monotonic() - self._rooms_listed_at >= ROOM_REGISTRY_TTL:
+                await self._refresh_rooms()
         except Exception as e:
             print(f"Error getting rooms from LiveKit: {e}")
-            return []
+            if not self._rooms_listed_at:
+                return []
+        return [dict(room) for _, room in self._rooms.values()]
 
     async def create(self, payload, user_id: str, **kwargs) -> Dict[str, Any]:
         """Create a pomodoro room directly in LiveKit without storing to database."""
@@ -80,7 +139,8 @@ class PomodoroRoomCRUD:
             create_request.max_participants = payload.limit
             create_request.metadata = json.dumps(metadata)
 
-            await self.livekit.room.create_room(create_request)
+            room = await self.livekit.room.create_room(create_request)
+            self.set_room(room)
 
             return {
                 "room_name": payload.room_name,
@@ -132,35 +192,14 @@ class PomodoroRoomCRUD:
             raise ServerError(detail="Can not generate token now. Try later")
 
     async def get_room_by_name(self, livekit_room_name: str) -> Dict[str, Any]:
-        """Get a room by its livekit_room_name from LiveKit."""
+        """Get a room by its livekit_room_name from the registry or LiveKit."""
+        room = self._get_fresh_room(livekit_room_name)
+        if room:
+            return room
         try:
-            rooms_response = await self.livekit.room.list_rooms(api.ListRoomsRequest())
-
-            for room in rooms_response.rooms:
-                if room.name == livekit_room_name:
-                    # Parse metadata from room
-                    metadata = {}
-                    if room.metadata:
-                        try:
-                            metadata = json.loads(room.metadata)
-                        except json.JSONDecodeError:
-                            metadata = {}
-
-                    return {
-                        "room_name": metadata.get("room_name", room.name),
-                        "livekit_room_name": room.name,
-                        "pomodoro_settings": metadata.get(
-                            "pomodoro_settings", PomodoroSectionSettings().model_dump()
-                        ),
-                        "limit": room.max_participants,
-                        "created_by": metadata.get("created_by", ""),
-                        "created_at": datetime.fromtimestamp(room.creation_time / 1000)
-                        if room.creation_time
-                        else datetime.now(),
-                        "num_participants": room.num_participants,
-                    }
-
-            raise ServerError(detail="Room not found")
+            return self.set_room(await self._fetch_room(livekit_room_name))
+        except NotFound as e:
+            raise e
         except Exception as e:
             print(f"Error getting room from LiveKit: {e}")
             import traceback
@@ -179,8 +218,9 @@ class PomodoroRoomCRUD:
             delete_request = api.DeleteRoomRequest()
             delete_request.room = livekit_room_name
             await self.livekit.room.delete_room(delete_request)
+            self.remove_room(livekit_room_name)
 
-        except ServerError as e:
+        except (NotFound, ServerError) as e:
             raise e
         except Exception as e:
             print(f"Error deleting room from LiveKit: {e}")
@@ -192,26 +232,19 @@ class PomodoroRoomCRUD:
     async def update(self, livekit_room_name: str, payload, user_id: str) -> Dict[str, Any]:
         """Update a pomodoro room's metadata in LiveKit."""
         try:
-            # Get room info first
-            room = await self.get_room_by_name(livekit_room_name)
+            # Current metadata must come from LiveKit, the registry may be behind
+            livekit_room = await self._fetch_room(livekit_room_name)
+            current_metadata = {}
+            if livekit_room.metadata:
+                try:
+                    current_metadata = json.loads(livekit_room.metadata)
+                except json.JSONDecodeError:
+                    current_metadata = {}
 
             # Check permission: user must be the creator
-            if room["created_by"] != user_id:
+            if current_metadata.get("created_by", "") != user_id:
                 raise ServerError(detail="You don't have permission to update this room")
 
-            # Get current metadata
-            rooms_response = await self.livekit.room.list_rooms(api.ListRoomsRequest())
-            current_metadata = {}
-
-            for r in rooms_response.rooms:
-                if r.name == livekit_room_name:
-                    if r.metadata:
-                        try:
-                            current_metadata = json.loads(r.metadata)
-                        except json.JSONDecodeError:
-                            current_metadata = {}
-                    break
-
             # Update metadata with new values
             if payload.room_name is not None:
                 current_metadata["room_name"] = payload.room_name
@@ -224,15 +257,14 @@ class PomodoroRoomCRUD:
             update_request.room = livekit_room_name
             update_request.metadata = json.dumps(current_metadata)
 
-            await self.livekit.room.update_room_metadata(update_request)
-
-            # Return updated room info
-            updated_room = await self.get_room_by_name(livekit_room_name)
-            updated_room["num_participants"] = room["num_participants"]
+            updated_room = self.set_room(
+                await self.livekit.room.update_room_metadata(update_request)
+            )
+            updated_room["num_participants"] = livekit_room.num_participants
 
             return updated_room
 
-        except ServerError as e:
+        except (NotFound, ServerError) as e:
             raise e
         except Exception as e:
             print(f"Error updating room in LiveKit: {e}")
@@ -1,14 +1,14 @@
 # default
-import asyncio
-from typing import Set
+from typing import Optional
 
 # libraries
-from fastapi import Request
+from fastapi import Depends, Header
 from sse_starlette.sse import EventSourceResponse
 
 # local
 from base.custom.router import BaseRouter
-from routers.v2.webhooks.api import active_connections
+from routers.authentication import auth_handler
+from routers.v2.webhooks.api import pomodoro_room_broadcaster
 
 
 router = BaseRouter(
@@ -19,42 +19,34 @@ router = BaseRouter(
 
 
 @router.get("/events")
-async def pomodoro_room_events_stream(request: Request):
+async def pomodoro_room_events_stream(
+    last_event_id: Optional[str] = Header(default=None),
+):
     """
     SSE endpoint for pomodoro room events.
     Clients can subscribe to this endpoint to receive real-time updates
     when rooms are created, deleted, or participants join/leave.
+    A reconnecting client receives the events it missed after Last-Event-ID.
     """
 
     async def event_generator():
-        # Create a queue for this connection
-        queue = asyncio.Queue()
-        active_connections.add(queue)
-
         try:
             # Send initial connection event
             yield {
                 "event": "connected",
                 "data": '{"message": "Connected to pomodoro room events stream"}',
-                "id": "init",
             }
 
-            # Keep connection alive and send events
-            while True:
-                if await request.is_disconnected():
-                    break
-
-                try:
-                    # Wait for events with timeout
-                    message = await asyncio.wait_for(queue.get(), timeout=30)
-                    yield message
-                except asyncio.TimeoutError:
-                    # Send keepalive comment every 30 seconds
-                    yield ": keepalive\n\n"
+            async for message in pomodoro_room_broadcaster.stream(last_event_id):
+                yield message
         except Exception as e:
             print(f"Error in SSE stream: {e}")
-        finally:
-            # Clean up connection
-            active_connections.discard(queue)
 
     return EventSourceResponse(event_generator())
+
+
+@router.get("/events/stats", description="subscriber count and lag of pomodoro room events")
+async def pomodoro_room_events_stats(
+    _: bool = Depends(auth_handler.access_token_auth_wrapper),
+) -> dict:
+    return pomodoro_room_broadcaster.stats()
@@ -27,7 +27,9 @@ async def get_list_of_pomodoros(
     current_user: Users = Depends(auth_handler.auth_wrapper),
 ) -> List[GetPomodoroResponse]:
     query = query.get_db_query()
-    return await pomodoro_crud.get_list(match_user_id=current_user["id"], **query)
+    return await pomodoro_crud.get_list(
+        projection_model=GetPomodoroResponse, match_user_id=current_user["id"], **query
+    )
 
 
 @router.get("/{pomodoro_id}", description="get a pomodoro")
@@ -35,7 +37,10 @@ async def get_a_pomodoro(
     pomodoro_id: str, current_user: Users = Depends(auth_handler.auth_wrapper)
 ) -> GetPomodoroResponse:
     return await pomodoro_crud.get_one(
-        match_id=pomodoro_id, match_user_id=current_user["id"], raise_if_missing=True
+        projection_model=GetPomodoroResponse,
+        match_id=pomodoro_id,
+        match_user_id=current_user["id"],
+        raise_if_missing=True,
     )
 
 
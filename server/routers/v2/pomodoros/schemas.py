@@ -5,10 +5,10 @@ from pydantic import BaseModel
 
 from models.pomodoro.pomodoros import PomodoroStatusEnum
 from base.custom.types import IDStr
-from base.custom.schemas import BaseSchema, Pagination
+from base.custom.schemas import BaseSchema, CursorPagination
 
 
-class GetListPomodoroQuery(Pagination):
+class GetListPomodoroQuery(CursorPagination):
     pass
 
 
@@ -2,19 +2,19 @@
 from typing import List, Annotated
 
 # libraries
-from fastapi import Depends, BackgroundTasks, Response
+from fastapi import Depends, Request
 
 # TODO: to error handler
 
 # local
-from base.custom.router import BaseRouter
+from base.custom.router import BaseRouter, get_pagination_headers
 from .schemas import (
     GetPostListResponse,
     GetPostResponse,
     GetPostListParams,
     GetPostParams,
 )
-from .crud import PostCRUD
+from .crud import PostCRUD, post_response_cache, POSTS_NAMESPACE
 
 router = BaseRouter(
     prefix="/posts",
@@ -27,27 +27,52 @@ post_crud = PostCRUD()
 
 @router.get_list("/")
 async def get_list_post(
-    response: Response,
+    request: Request,
     params: Annotated[dict, Depends(GetPostListParams)],
 ) -> List[GetPostListResponse]:
-    return await post_crud.get_list(params)
+    async def get_content():
+        posts, total = await post_crud.get_list(params)
+        return posts, get_pagination_headers(total, params.page, params.per_page)
+
+    return await post_response_cache.get_or_set(
+        request,
+        [POSTS_NAMESPACE],
+        params.model_dump(mode="json"),
+        List[GetPostListResponse],
+        get_content,
+    )
 
 
 @router.get(
     "/{post_id}/_related",
 )
 async def get_related_post(
+    request: Request,
     post_id: str,
 ) -> List[GetPostListResponse]:
-    return await post_crud.get_related_list(post_id)
+    async def get_content():
+        return await post_crud.get_related_list(post_id), {}
+
+    return await post_response_cache.get_or_set(
+        request, [POSTS_NAMESPACE], {}, List[GetPostListResponse], get_content
+    )
 
 
 @router.get(
     "/{post_id}",
 )
 async def get_post(
+    request: Request,
     post_id: str,
     params: Annotated[dict, Depends(GetPostParams)],
-    background_tasks: BackgroundTasks,
 ) -> GetPostResponse:
-    return await post_crud.get_one(post_id, params, background_tasks)
+    async def get_content():
+        return await post_crud.get_one(post_id), {}
+
+    # increase_view does not change the content, not part of the key
+    response = await post_response_cache.get_or_set(
+        request, [POSTS_NAMESPACE], {}, GetPostResponse, get_content
+    )
+    if params.increase_view:
+        post_crud.increase_view(post_id)
+    return response
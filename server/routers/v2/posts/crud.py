@@ -1,22 +1,48 @@
 from typing import List, Optional
-import datetime
-from pydantic import model_validator, computed_field
+
+import orjson
 from beanie import PydanticObjectId
-from beanie.operators import ElemMatch
+from bson import ObjectId
 from pydantic_core._pydantic_core import ValidationError
 
-from models import Posts as DBPost
+from models import Posts as DBPost, RelatedPosts
+from models.news.posts import post_view_counter, to_deadline
 from base.custom.crud import BaseCRUD
 from base.custom.http_status import NotFound
+from base.settings import settings, is_dev_env
 from utils.beanie_odm import get_projections_from_model
-from utils.text_convertion import gen_slug
-from utils.beanie_odm import (
-    count_total,
-    cursor_pipeline_rearrange,
-)
+from utils.cache import SharedCache
+from utils.index_audit import QueryShape, report_plan
+from utils.response_cache import ResponseCache
 from utils.time_modules import vn_now
 from .schemas import GetPostListResponse
 
+# total of a post list per (search, tags, is_expired) filter, shared across workers
+# and invalidated with the post responses (see invalidate_post_caches)
+post_count_cache = SharedCache("post_count", max_size=1024, ttl=60, redis_url=settings.REDIS_URL)
+
+# serialized responses of the public post endpoints, invalidated by admin post routes
+post_response_cache = ResponseCache(
+    "post_response",
+    max_size=4096,
+    ttl=settings.POST_RESPONSE_CACHE_TTL,
+    redis_url=settings.REDIS_URL,
+)
+POSTS_NAMESPACE = "posts"
+
+
+async def invalidate_post_caches() -> None:
+    """
+    Drop cached responses and list totals of posts, called by admin post routes
+    """
+    await post_response_cache.invalidate(POSTS_NAMESPACE)
+    await post_count_cache.invalidate(POSTS_NAMESPACE)
+
+
+RELATED_POSTS_SIZE = 3
+# candidates kept per post, room for the ones expiring before the next refresh
+RELATED_POSTS_CANDIDATES = 12
+
 
 class PostListProject(GetPostListResponse):
     id: PydanticObjectId
@@ -25,27 +51,129 @@ class PostListProject(GetPostListResponse):
     class Settings:
         projection = get_projections_from_model(
             GetPostListResponse,
-            exclude_fields=["slug", "is_expired"],
+            exclude_fields=["is_expired"],
             map_fields={
                 "deadline": "other_information.deadline",
             },
         )
 
-    @model_validator(mode="after")
-    def gen_slug(cls, values):
-        if not len(values.slug) and values.title:
-            values.slug = gen_slug(values.title)
-        return values
 
-    @computed_field
-    @property
-    def is_expired(self) -> bool:
-        if self.deadline is None:
-            return False
-        deadline = self.deadline
-        if isinstance(deadline, str):
-            deadline = datetime.date.fromisoformat(deadline)
-        return vn_now().date() > deadline
+def is_expired(deadline: Optional[str], today: str) -> bool:
+    # deadline is an ISO date string, compared as string
+    return deadline is not None and deadline < today
+
+
+def set_is_expired(posts: List[PostListProject]) -> List[PostListProject]:
+    """
+    Set is_expired of posts from one now, same rule as match_is_expired of Posts.build_query
+    """
+    today = vn_now().date().isoformat()
+    for post in posts:
+        post.is_expired = is_expired(post.deadline, today)
+    return posts
+
+
+def _related_item_projection(tags: List[str]) -> dict:
+    """$project of a related post item: post list fields and tag overlap with tags"""
+    return {
+        **PostListProject.Settings.projection,
+        "_id": 0,
+        "overlap": {"$size": {"$setIntersection": [{"$ifNull": ["$tags", []]}, tags]}},
+    }
+
+
+async def build_related_posts(post_id: ObjectId, tags: List[str]) -> List[dict]:
+    """
+    Rank posts sharing tags with a post by tag overlap then recency, store the snapshot
+    Returns:
+        Related post items, best first
+    """
+    today = to_deadline(vn_now().date())
+    related = []
+    if tags:
+        related = await DBPost.aggregate(
+            [
+                {
+                    "$match": {
+                        "_id": {"$ne": post_id},
+                        "tags": {"$in": tags},
+                        "deadline": {"$not": {"$lt": today}},
+                    }
+                },
+                {"$project": _related_item_projection(tags)},
+                {"$sort": {"overlap": -1, "id": -1}},
+                {"$limit": RELATED_POSTS_CANDIDATES},
+            ]
+        ).to_list()
+    await RelatedPosts.get_pymongo_collection().update_one(
+        {"post_id": post_id},
+        {"$set": {"tags": tags, "related": related, "updated_at": vn_now()}},
+        upsert=True,
+    )
+    return related
+
+
+async def refresh_related_posts(post: DBPost) -> None:
+    """
+    Refresh related posts after a post is created or updated
+    - Rebuild the snapshot of the post
+    - Put the post in the snapshots of posts sharing its tags, at its rank
+    - Remove the post from snapshots of posts not sharing its tags anymore
+    """
+    tags = post.tags or []
+    await build_related_posts(post.id, tags)
+
+    collection = RelatedPosts.get_pymongo_collection()
+    await collection.update_many(
+        {"related.id": post.id, "tags": {"$nin": tags}},
+        {"$pull": {"related": {"id": post.id}}},
+    )
+    if not tags:
+        return
+    items = await DBPost.aggregate(
+        [
+            {"$match": {"_id": post.id}},
+            {"$project": {**PostListProject.Settings.projection, "_id": 0}},
+        ]
+    ).to_list()
+    if not items:
+        return
+    # $literal: text of the post must not be read as field paths/operators
+    item = {
+        "$mergeObjects": [
+            {"$literal": items[0]},
+            {"overlap": {"$size": {"$setIntersection": ["$tags", tags]}}},
+        ]
+    }
+    other_related = {"$filter": {"input": "$related", "cond": {"$ne": ["$$this.id", post.id]}}}
+    await collection.update_many(
+        {"tags": {"$in": tags}, "post_id": {"$ne": post.id}},
+        [
+            {
+                "$set": {
+                    "related": {
+                        "$slice": [
+                            {
+                                "$sortArray": {
+                                    "input": {"$concatArrays": [other_related, [item]]},
+                                    "sortBy": {"overlap": -1, "id": -1},
+                                }
+                            },
+                            RELATED_POSTS_CANDIDATES,
+                        ]
+                    },
+                    "updated_at": vn_now(),
+                }
+            }
+        ],
+    )
+
+
+async def remove_related_posts(post_id: ObjectId) -> None:
+    """Remove the snapshot of a deleted post and the post from other snapshots"""
+    collection = RelatedPosts.get_pymongo_collection()
+    await collection.delete_one({"post_id": post_id})
+    await collection.update_many({"related.id": post_id}, {"$pull": {"related": {"id": post_id}}})
 
 
 class PostCRUD(BaseCRUD[DBPost]):
@@ -54,42 +182,79 @@ class PostCRUD(BaseCRUD[DBPost]):
 
     async def get_list(self, params) -> List[DBPost]:
         find_queries, agg_queries = self.model.build_query(params)
-        cursor = self.model.find(
-            find_queries,
-            skip=params.per_page * (params.page - 1),
-            limit=params.per_page,
-            sort=None if params.match_search else ("_id", -1),
-            ignore_cache=bool(params.match_search),
-        ).aggregate(agg_queries, projection_model=PostListProject)
-        cursor = cursor_pipeline_rearrange(cursor)
-
-        posts = await cursor.to_list()
-        total_count = await count_total(cursor)
-        return posts, total_count
-
-    async def get_related_list(self, post_id) -> List[DBPost]:
-        try:
-            post = await self.model.get(post_id)
-        except (AttributeError, ValidationError):
+        skip = params.per_page * (params.page - 1)
+
+        # $search must stay the first stage
+        pipeline = [*agg_queries]
+        if find_queries:
+            pipeline.append({"$match": find_queries})
+        if not params.match_search:
+            pipeline.append({"$sort": {"_id": -1}})
+        # $search plans are not explainable as a find
+        if is_dev_env and not agg_queries:
+            await report_plan(QueryShape("post list", self.model, find_queries, [("_id", -1)]))
+
+        items_pipeline = []
+        if skip:
+            items_pipeline.append({"$skip": skip})
+        items_pipeline.append({"$limit": params.per_page})
+        items_pipeline.append({"$project": PostListProject.Settings.projection})
+
+        # hits and total from one execution of the pipeline
+        # total is reused from cache for the next pages of the same search
+        count_key = orjson.dumps(
+            [params.match_search, params.match_tags, params.match_is_expired]
+        ).decode()
+        total_count = await post_count_cache.get([POSTS_NAMESPACE], count_key)
+        if total_count is None:
+            pipeline.append({"$facet": {"items": items_pipeline, "total": [{"$count": "count"}]}})
+        else:
+            pipeline.extend(items_pipeline)
+
+        result = await self.model.aggregate(pipeline).to_list()
+
+        if total_count is None:
+            facet = result[0] if result else {"items": [], "total": []}
+            result = facet["items"]
+            total_count = facet["total"][0]["count"] if facet["total"] else 0
+            await post_count_cache.set([POSTS_NAMESPACE], count_key, total_count)
+
+        posts = [PostListProject.model_validate(post) for post in result]
+        return set_is_expired(posts), total_count
+
+    async def get_related_list(self, post_id) -> List[PostListProject]:
+        if not ObjectId.is_valid(post_id):
             raise NotFound(detail="Post not found")
+        post_id = ObjectId(post_id)
 
-        # TODO: only get not expired posts(when lib support datetime.date)
-        posts = await (
-            self.model
-            # find post that have same tags
-            .find(ElemMatch(self.model.tags, {"$in": post.tags}))
-            .aggregate([{"$sample": {"size": 3}}], projection_model=PostListProject)
-            .to_list()
+        snapshot = await RelatedPosts.get_pymongo_collection().find_one(
+            {"post_id": post_id}, {"related": 1}
         )
+        if snapshot is None:
+            # built once for posts created before related posts snapshots
+            post = await self.model.get(post_id)
+            if post is None:
+                raise NotFound(detail="Post not found")
+            related = await build_related_posts(post.id, post.tags or [])
+        else:
+            related = snapshot["related"]
 
-        return posts
+        # snapshot is refreshed on writes only, posts may have expired since
+        today = vn_now().date().isoformat()
+        return [
+            PostListProject.model_validate(item)
+            for item in related
+            if item["id"] != post_id and not is_expired(item.get("deadline"), today)
+        ][:RELATED_POSTS_SIZE]
 
-    async def get_one(self, post_id, params, background_tasks) -> DBPost:
+    async def get_one(self, post_id) -> DBPost:
         try:
             post = await self.model.get(post_id)
             post.id = str(post.id)
-            if params.increase_view:
-                background_tasks.add_task(post.increase_view)
             return post
         except (AttributeError, ValidationError):
             raise NotFound(detail="Post not found")
+
+    def increase_view(self, post_id: str) -> None:
+        # counted on cache hits too, coalesced and flushed with $inc
+        post_view_counter.increment(PydanticObjectId(post_id))
@@ -3,13 +3,12 @@ import datetime
 from typing import List, Optional, Union
 
 # libraries
-from pydantic import BaseModel, model_validator, computed_field
+from pydantic import BaseModel, model_validator
 
 # local
 from base.custom.types import IDStr
 from base.custom.schemas import Pagination
 from utils.text_convertion import gen_slug
-from utils.time_modules import vn_now
 
 
 # TODO: remove duplicate code(using project beanie)
@@ -34,6 +33,7 @@ class BasePost(BaseModel):
     # SEO
     keywords: List[str]
 
+    # slug is stored on the post, only generated for posts not backfilled yet
     @model_validator(mode="after")
     def gen_slug(cls, values):
         if not len(values.slug) and values.title:
@@ -45,13 +45,8 @@ class BasePost(BaseModel):
 class GetPostListResponse(BasePost):
     id: IDStr
     deadline: Optional[str] = datetime.date
-
-    @computed_field
-    @property
-    def is_expired(self) -> Optional[bool]:
-        if self.deadline is None:
-            return False
-        return vn_now() > datetime.datetime.fromisoformat(self.deadline)
+    # set once per request from a single now, see routers/v2/posts/crud.set_is_expired
+    is_expired: bool = False
 
 
 class GetPostResponse(BasePost):
@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import BackgroundTasks, HTTPException, Response, Depends
+from fastapi import HTTPException, Response, Depends
 
 from routers.authentication import auth_handler
 from base.custom.router import BaseRouter
@@ -21,15 +21,15 @@ shorten_link_crud = ShortenLinkCRUD()
 )
 async def redirect_shorten_link(
     link_name: str,
-    background_tasks: BackgroundTasks,
 ):
-    link = await shorten_link_crud.get_by_link_name(link_name)
-    if not link:
+    redirect = await shorten_link_crud.get_redirect(link_name)
+    if not redirect:
         raise HTTPException(status_code=404, detail="Link not found")
 
-    background_tasks.add_task(shorten_link_crud.increment_access_count, link_name)
+    link_id, redirect_link = redirect
+    shorten_link_crud.increment_access_count(link_id)
 
-    return Response(status_code=302, headers={"Location": link.redirect_link})
+    return Response(status_code=302, headers={"Location": redirect_link})
 
 
 @router.post(
@@ -1,40 +1,119 @@
-import hashlib
-import time
-from typing import List
+import secrets
+import string
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
 
 from models import ShortenLinks as DBShortenLink
 from base.custom.crud import BaseCRUD
+from base.custom.http_status import BadRequest, ServerError
+from base.settings import settings
+from utils.cache import TTLCache
+from utils.counters import BufferedCounter
 
 from .schemas import LinkPayload, ShortenLinkResponse
 
+# redirects are counted in memory, flushed with $inc every COUNTER_FLUSH_INTERVAL
+access_counter = BufferedCounter(
+    DBShortenLink, "access_count", flush_interval=settings.COUNTER_FLUSH_INTERVAL
+)
+
+# link_name -> (link id, redirect link), or LINK_NOT_FOUND for unknown names
+redirect_cache = TTLCache(max_size=10000, ttl=300)
+LINK_NOT_FOUND = ()
+# unknown names are cached shorter, a link created on another worker shows up after this
+NOT_FOUND_TTL = 30
+
+# random base62 codes, 62^8 ~ 2.2e14 names
+LINK_NAME_ALPHABET = string.digits + string.ascii_letters
+LINK_NAME_LENGTH = 8
+# insert attempts of generated names colliding with existing ones
+MAX_INSERT_ATTEMPTS = 5
+DUPLICATE_KEY_ERROR = 11000
+
+
+def generate_link_name() -> str:
+    return "".join(secrets.choice(LINK_NAME_ALPHABET) for _ in range(LINK_NAME_LENGTH))
+
 
 class ShortenLinkCRUD(BaseCRUD[DBShortenLink]):
     def __init__(self):
         super().__init__(DBShortenLink)
 
-    @staticmethod
-    def _generate_link_name(redirect_link: str, redirect_name: str | None = None) -> str:
-        if redirect_name:
-            return redirect_name
-        raw = f"{redirect_link}{time.time()}"
-        return hashlib.md5(raw.encode()).hexdigest()[:8]
-
     async def create_many(self, links: List[LinkPayload]) -> List[ShortenLinkResponse]:
-        results = []
-        for link in links:
-            link_name = self._generate_link_name(str(link.redirect_link), link.redirect_name)
-            db_obj = DBShortenLink(
-                link_name=link_name,
+        """
+        Insert all links with one insert_many
+        Generated names that collide are regenerated and only those links are inserted again,
+        a taken custom name (redirect_name) fails the whole request, links of the batch
+        inserted meanwhile are deleted
+        """
+        custom_names = [link.redirect_name for link in links if link.redirect_name]
+        if len(set(custom_names)) != len(custom_names):
+            raise BadRequest(detail="Duplicate redirect_name in request")
+        if custom_names:
+            taken_links = await DBShortenLink.find({"link_name": {"$in": custom_names}}).to_list()
+            if taken_links:
+                taken_names = ", ".join(link.link_name for link in taken_links)
+                raise BadRequest(detail=f"redirect_name is taken: {taken_names}")
+
+        db_objs = [
+            DBShortenLink(
+                id=ObjectId(),
+                link_name=link.redirect_name or generate_link_name(),
                 redirect_link=str(link.redirect_link),
             )
-            await db_obj.insert()
-            results.append(db_obj)
-        return results
+            for link in links
+        ]
+        is_custom = {db_obj.id: bool(link.redirect_name) for db_obj, link in zip(db_objs, links)}
+
+        pending = db_objs
+        for _ in range(MAX_INSERT_ATTEMPTS):
+            if not pending:
+                break
+            try:
+                await DBShortenLink.insert_many(pending, ordered=False)
+                pending = []
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                if any(error["code"] != DUPLICATE_KEY_ERROR for error in write_errors):
+                    raise
+                collided = [pending[error["index"]] for error in write_errors]
+                if any(is_custom[db_obj.id] for db_obj in collided):
+                    # unordered insert saved the rest of the batch, the request fails as a whole
+                    collided_ids = {db_obj.id for db_obj in collided}
+                    inserted_ids = [
+                        db_obj.id for db_obj in db_objs if db_obj.id not in collided_ids
+                    ]
+                    await DBShortenLink.get_pymongo_collection().delete_many(
+                        {"_id": {"$in": inserted_ids}}
+                    )
+                    raise BadRequest(detail="redirect_name is taken")
+                for db_obj in collided:
+                    db_obj.link_name = generate_link_name()
+                pending = collided
+        if pending:
+            raise ServerError(detail="Can not generate link names now. Try later")
+
+        for db_obj in db_objs:
+            redirect_cache.delete(db_obj.link_name)
+        return db_objs
 
     async def get_by_link_name(self, link_name: str) -> DBShortenLink | None:
         return await DBShortenLink.find_one(DBShortenLink.link_name == link_name)
 
-    async def increment_access_count(self, link_name: str):
-        link = await self.get_by_link_name(link_name)
-        if link:
-            await link.set({DBShortenLink.access_count: link.access_count + 1})
+    async def get_redirect(self, link_name: str) -> Optional[Tuple[ObjectId, str]]:
+        """(link id, redirect link) of a link name, served from redirect_cache"""
+        redirect = redirect_cache.get(link_name)
+        if redirect is None:
+            link = await self.get_by_link_name(link_name)
+            if link:
+                redirect = (link.id, link.redirect_link)
+                redirect_cache.set(link_name, redirect)
+            else:
+                redirect = LINK_NOT_FOUND
+                redirect_cache.set(link_name, redirect, ttl=NOT_FOUND_TTL)
+        return redirect or None
+
+    def increment_access_count(self, link_id: ObjectId):
+        access_counter.increment(link_id)
@@ -26,7 +26,9 @@ async def get_list_of_task(
     current_user: Users = Depends(auth_handler.auth_wrapper),
 ) -> List[GetTaskResponse]:
     query = query.get_db_query()
-    return await task_crud.get_list(match_user_id=current_user["id"], **query)
+    return await task_crud.get_list(
+        projection_model=GetTaskResponse, match_user_id=current_user["id"], **query
+    )
 
 
 @router.get("/{task_id}", description="Get a task")
@@ -34,7 +36,10 @@ async def get_a_task(
     task_id: str, current_user: Users = Depends(auth_handler.auth_wrapper)
 ) -> GetTaskResponse:
     return await task_crud.get_one(
-        match_id=task_id, match_user_id=current_user["id"], raise_if_missing=True
+        projection_model=GetTaskResponse,
+        match_id=task_id,
+        match_user_id=current_user["id"],
+        raise_if_missing=True,
     )
 
 
@@ -1,15 +1,16 @@
 import datetime
 
 # fastapi
-from pydantic import Field, model_validator
+from pydantic import Field
 from typing import Optional, List
 
 # local
-from base.custom.schemas import BaseSchema, Pagination
+from base.custom.schemas import BaseSchema, CursorPagination
+from base.custom.types import IDStr
 from models.pomodoro.tasks import TaskStatusEnum
 
 
-class GetTaskListQuery(Pagination):
+class GetTaskListQuery(CursorPagination):
     pass
 
 
@@ -34,11 +35,4 @@ class PatchTaskPayload(BaseSchema):
 
 
 class GetTaskResponse(BaseTask):
-    id: str
-
-    # TODO: to BaseSchemaModel
-    @model_validator(mode="before")
-    @classmethod
-    def id_valid_str(cls, data):
-        data.id = str(data.id)
-        return data
+    id: IDStr
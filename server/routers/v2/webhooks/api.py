@@ -1,17 +1,14 @@
-import asyncio
 import json
-import uuid
 from datetime import datetime
-from typing import Dict, Set
 
 from fastapi import Request, Depends
-from sse_starlette.sse import EventSourceResponse
-import orjson
 
-from base.settings import app
+from base.settings import app, settings
 from base.custom.router import BaseRouter
 from routers.authentication.auth import livekit_webhook_handler
 from routers.v2.pomodoro_rooms.api import p_room_crud
+from utils.broadcaster import Broadcaster
+from utils.pubsub import get_pubsub_backend
 
 router = BaseRouter(
     prefix="/webhooks",
@@ -19,34 +16,22 @@ router = BaseRouter(
     responses={404: {"description": "Not found"}},
 )
 
-# Store active SSE connections
-active_connections: Set[asyncio.Queue] = set()
+# Fan-out of pomodoro room events to SSE clients of every worker
+# (Redis pub/sub when REDIS_URL is set, in-process otherwise)
+pomodoro_room_broadcaster = Broadcaster(
+    "pomodoro_rooms:events", backend=get_pubsub_backend(settings.REDIS_URL)
+)
 
 
 async def broadcast_event(event_type: str, data: dict):
     """Broadcast an event to all active SSE connections."""
-    if not active_connections:
-        return
-
-    message = {
-        "event": event_type,
-        "retry": 15000,
-        "data": json.dumps(
-            {
-                **data,
-                "datetime": datetime.now().isoformat(sep="T", timespec="auto"),
-            }
-        ),
-        "id": str(uuid.uuid4()),
-    }
-
-    # Send to all active connections
-    for queue in list(active_connections):
-        try:
-            await queue.put(message)
-        except Exception:
-            # Remove broken connection
-            active_connections.discard(queue)
+    await pomodoro_room_broadcaster.publish(
+        event_type,
+        {
+            **data,
+            "datetime": datetime.now().isoformat(sep="T", timespec="auto"),
+        },
+    )
 
 
 @app.webhooks.post("/api/pomodoro-rooms/livekit")
@@ -77,14 +62,18 @@ async def livekit_webhook(event=Depends(livekit_webhook_handler.verify)):
         "room_started",
     ]:
         print(f"Livekit room {event.room.name} created")
-        room = await p_room_crud.get_room_by_name(event.room.name)
-        data = orjson.loads(orjson.dumps(room))
+        # the webhook carries the room, no need to ask LiveKit again
+        data = p_room_crud.set_room(event.room)
     elif event.event in ["participant_joined", "participant_left"]:
+        p_room_crud.change_num_participants(
+            event.room.name, 1 if event.event == "participant_joined" else -1
+        )
         data = {
             "livekit_room_name": event.room.name,
             "user_id": json.loads(event.participant.metadata).get("user_id"),
         }
     elif event.event == "room_finished":
+        p_room_crud.remove_room(event.room.name)
         data = {
             "livekit_room_name": event.room.name,
         }
@@ -1,6 +1,13 @@
+### change dir ###
+import sys
+from pathlib import Path
+
+# run as a script (scrap/func.py), server root holds utils
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+### change dir ###
+
 # default
 import re
-from pathlib import Path
 from lxml import etree, html
 
 # library
@@ -8,18 +15,11 @@ import aiofiles
 import aiohttp
 from scrapy import Selector
 
-
-DATA_DIR = f"{Path(__file__).resolve().parent.parent}/data"
+# local
+from utils.text_convertion import gen_slug
 
 
-# TODO: this func duplicate code from services
-def generate_slug(s: str) -> str:
-    """Generates a slug from the given text, handling various cases."""
-    s = s.lower().strip()
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"[\s_-]+", "-", s)
-    s = re.sub(r"^-+|-+$", "", s)
-    return s
+DATA_DIR = f"{Path(__file__).resolve().parent.parent}/data"
 
 
 def remove_empty_string(s: str) -> str:
@@ -36,7 +36,7 @@ async def save_image(url: str) -> str:
         async with session.get(url) as resp:
             if resp.status == 200:
                 img_name = url.split("/")[-1].replace(".png", "").replace(".jpg", "")
-                img_name = generate_slug(img_name)
+                img_name = gen_slug(img_name)
                 img_name += ".png"
                 f = await aiofiles.open(f"{DATA_DIR}/media/{img_name}", mode="wb")
                 await f.write(await resp.read())
@@ -0,0 +1,179 @@
+"""
+One-off maintenance commands
+Usage:
+    python scripts.py <command>
+Example:
+    python scripts.py backfill_study_time_rollups
+    python scripts.py audit_indexes
+    python scripts.py backfill_post_slugs
+    python scripts.py build_related_posts
+    python scripts.py backfill_post_deadlines
+    python scripts.py dedupe_link_names
+"""
+
+# default
+import asyncio
+import sys
+
+# libraries
+from pymongo import UpdateOne
+
+# local
+from base.settings import IndexBuildEnum
+from models import (
+    connect_db,
+    Pomodoros,
+    Posts,
+    ShortenLinks,
+    StudyTimeRollups,
+    RollupSourceEnum,
+    UserDailyStudyTimes,
+    query_shapes,
+)
+from models.news.posts import to_deadline
+from routers.v2.posts.crud import build_related_posts as build_post_related_posts
+from routers.v2.shorten_links.crud import generate_link_name
+from utils import index_audit
+from utils.text_convertion import gen_slug
+
+
+async def backfill_study_time_rollups():
+    """
+    Rebuild study time rollups from UserDailyStudyTimes and completed Pomodoros
+    """
+    await StudyTimeRollups.get_pymongo_collection().delete_many({})
+
+    daily_study_times = await UserDailyStudyTimes.find_all().to_list()
+    await StudyTimeRollups.write_increments(
+        RollupSourceEnum.DISCORD,
+        StudyTimeRollups.build_daily_study_time_increments(daily_study_times),
+        operator="$set",
+    )
+    print(f"Rolled up {len(daily_study_times)} daily study times")
+
+    # split and grouped per day in MongoDB, only day rows are shipped here
+    daily_minutes = await Pomodoros.daily_minutes()
+    await StudyTimeRollups.write_increments(
+        RollupSourceEnum.POMODORO,
+        StudyTimeRollups.build_daily_minutes_increments(daily_minutes),
+        operator="$set",
+    )
+    print(f"Rolled up {len(daily_minutes)} days of pomodoros")
+
+
+async def audit_indexes():
+    """
+    Explain hot query shapes, exit with error when one is not served by an index
+    """
+    results = await index_audit.audit_indexes(query_shapes)
+    if any(result["collection_scan"] or result["in_memory_sort"] for result in results):
+        sys.exit(1)
+
+
+async def backfill_post_slugs(batch_size: int = 500):
+    """
+    Store the slug of posts created before slugs were generated on insert
+    """
+    collection = Posts.get_pymongo_collection()
+    cursor = collection.find({"$or": [{"slug": {"$exists": False}}, {"slug": ""}]}, {"title": 1})
+    requests = []
+    updated_count = 0
+    async for post in cursor:
+        requests.append(
+            UpdateOne({"_id": post["_id"]}, {"$set": {"slug": gen_slug(post["title"])}})
+        )
+        if len(requests) >= batch_size:
+            await collection.bulk_write(requests, ordered=False)
+            updated_count += len(requests)
+            requests = []
+    if requests:
+        await collection.bulk_write(requests, ordered=False)
+        updated_count += len(requests)
+    print(f"Backfilled slug of {updated_count} posts")
+
+
+async def build_related_posts():
+    """
+    Rebuild related posts snapshots of every post (first deploy, or to drop expired candidates)
+    """
+    posts = Posts.get_pymongo_collection().find({}, {"tags": 1})
+    post_count = 0
+    async for post in posts:
+        await build_post_related_posts(post["_id"], post.get("tags") or [])
+        post_count += 1
+    print(f"Built related posts of {post_count} posts")
+
+
+async def backfill_post_deadlines(batch_size: int = 500):
+    """
+    Copy other_information.deadline (ISO string) of existing posts to the typed deadline field
+    """
+    collection = Posts.get_pymongo_collection()
+    cursor = collection.find({"deadline": {"$exists": False}}, {"other_information": 1})
+    requests = []
+    updated_count = 0
+    async for post in cursor:
+        deadline = to_deadline((post.get("other_information") or {}).get("deadline"))
+        requests.append(UpdateOne({"_id": post["_id"]}, {"$set": {"deadline": deadline}}))
+        if len(requests) >= batch_size:
+            await collection.bulk_write(requests, ordered=False)
+            updated_count += len(requests)
+            requests = []
+    if requests:
+        await collection.bulk_write(requests, ordered=False)
+        updated_count += len(requests)
+    print(f"Backfilled deadline of {updated_count} posts")
+
+
+async def dedupe_link_names():
+    """
+    Rename shorten links sharing a link_name (created before link_name was unique),
+    the oldest link keeps the name, the others get a generated name
+    The unique index on link_name can not be built until this reports no duplicate
+    """
+    collection = ShortenLinks.get_pymongo_collection()
+    duplicates = await ShortenLinks.aggregate(
+        [
+            {"$group": {"_id": "$link_name", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]
+    ).to_list()
+    renamed_count = 0
+    for duplicate in duplicates:
+        for link_id in sorted(duplicate["ids"])[1:]:
+            link_name = generate_link_name()
+            while await collection.find_one({"link_name": link_name}, {"_id": 1}):
+                link_name = generate_link_name()
+            await collection.update_one({"_id": link_id}, {"$set": {"link_name": link_name}})
+            print(f"Renamed {link_id}: {duplicate['_id']} -> {link_name}")
+            renamed_count += 1
+    print(f"Renamed {renamed_count} links of {len(duplicates)} duplicated names")
+
+
+commands = {
+    "backfill_study_time_rollups": backfill_study_time_rollups,
+    "audit_indexes": audit_indexes,
+    "backfill_post_slugs": backfill_post_slugs,
+    "build_related_posts": build_related_posts,
+    "backfill_post_deadlines": backfill_post_deadlines,
+    "dedupe_link_names": dedupe_link_names,
+}
+# fix data that a unique index rejects, indexes are not built before them
+skip_index_commands = {"dedupe_link_names"}
+
+
+async def main(command: str):
+    if command not in commands:
+        print(f"Unknown command. Available: {', '.join(commands)}")
+        return
+    # indexes are needed right away (audit_indexes), the loop ends with the command
+    await connect_db(
+        IndexBuildEnum.SKIP.value
+        if command in skip_index_commands
+        else IndexBuildEnum.STARTUP.value
+    )
+    await commands[command]()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else ""))
@@ -40,7 +40,7 @@ def auth_client(mocker):
         "avatar_url": "https://cdn.discordapp.com/avatars/111111111111111111/11111111111111111111111111111111.png",
         "roles": ["owner", "admin"],
     }
-    mocker.patch.object(auth_handler, "decode_token", return_value=auth_mocker)
+    mocker.patch.object(auth_handler, "verify_token", return_value=(auth_mocker, None))
     return TestClient(app, headers={"Authorization": "Bearer aaa"})
 
 
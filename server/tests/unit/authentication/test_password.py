@@ -0,0 +1,56 @@
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from models import Users
+from routers.authentication.auth import auth_handler
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_login_verify_off_event_loop_and_rehash(init_db, client, mocker):
+    """
+    INPUT:
+        Login with a valid password whose hash use old bcrypt rounds
+    OUTPUT:
+        Password is verified in the password executor, new hash is saved
+    """
+    await init_db
+    verify_threads = []
+
+    def verify_and_update(plain_password, hashed_password):
+        verify_threads.append(threading.current_thread().name)
+        return True, "new-hash"
+
+    mocker.patch.object(auth_handler.pwd_context, "verify_and_update", verify_and_update)
+    dbuser = MagicMock(password="old-hash", save=AsyncMock())
+    dbuser.get_info.return_value = {"id": "111111111111111111111111", "name": "khoitm"}
+    mocker.patch.object(Users, "find_one", new_callable=AsyncMock, return_value=dbuser)
+
+    response = client.post("/api/auth/login", json={"email": "a@gmail.com", "password": "abc"})
+
+    assert response.status_code == 200
+    assert verify_threads[0].startswith("password")
+    assert dbuser.password == "new-hash"
+    dbuser.save.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_login_wrong_password(init_db, client, mocker):
+    """
+    INPUT:
+        Login with a wrong password
+    OUTPUT:
+        401, nothing saved
+    """
+    await init_db
+    mocker.patch.object(auth_handler.pwd_context, "verify_and_update", return_value=(False, None))
+    dbuser = MagicMock(password="hash", save=AsyncMock())
+    mocker.patch.object(Users, "find_one", new_callable=AsyncMock, return_value=dbuser)
+
+    response = client.post("/api/auth/login", json={"email": "a@gmail.com", "password": "abc"})
+
+    assert response.status_code == 401
+    dbuser.save.assert_not_awaited()
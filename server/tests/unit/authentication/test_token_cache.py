@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+from routers.authentication.auth import AuthHandler
+
+pytest_plugins = ("pytest_asyncio",)
+
+USER = {"id": "111111111111111111111111", "name": "khoitm", "avatar_url": "https://a.png"}
+
+
+def _token(handler: AuthHandler, expire_in: timedelta) -> str:
+    return jwt.encode(
+        {"exp": datetime.utcnow() + expire_in, "iat": datetime.utcnow(), "sub": USER},
+        handler.secret,
+        algorithm="HS256",
+    )
+
+
+def test_verify_token_cached_by_digest(mocker):
+    """
+    INPUT:
+        Verify the same valid token twice
+    OUTPUT:
+        Signature is verified once, callers get independent copies of the claims
+    """
+    handler = AuthHandler()
+    handler.verified_tokens.clear()
+    token = handler.encode_token(USER)
+    jwt_decode = mocker.spy(jwt, "decode")
+
+    user, error = handler.verify_token(token)
+    user["name"] = "changed"
+    cached_user, _ = handler.verify_token(token)
+
+    assert error is None
+    assert cached_user == USER
+    assert jwt_decode.call_count == 1
+
+
+def test_verify_token_honor_exp(mocker):
+    """
+    INPUT:
+        Verify a cached token after its exp
+    OUTPUT:
+        Expired error, even if the cache entry is still alive
+    """
+    handler = AuthHandler()
+    handler.verified_tokens.clear()
+    token = _token(handler, timedelta(seconds=30))
+    assert handler.verify_token(token)[1] is None
+
+    mocker.patch(
+        "routers.authentication.auth.time.time", return_value=datetime.now().timestamp() + 60
+    )
+    user, error = handler.verify_token(token)
+
+    assert user is None
+    assert error.detail == "Signature has expired"
+
+
+@pytest.mark.asyncio
+async def test_invalid_header_fallback_to_cookie(client):
+    """
+    INPUT:
+        Invalid token in header, valid token in cookie
+    OUTPUT:
+        Authenticated by the cookie
+    """
+    handler = AuthHandler()
+    response = client.get(
+        "/api/auth/self",
+        headers={"Authorization": "Bearer invalid"},
+        cookies={"Authorization": handler.encode_token(USER)},
+    )
+    assert response.status_code == 200
+    assert response.json()["custom_name"] == "khoitm"
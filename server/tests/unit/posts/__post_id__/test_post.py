@@ -3,7 +3,9 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from models.news.posts import post_view_counter
 from routers.v2.posts.api import post_crud
+from routers.v2.posts.crud import post_response_cache, POSTS_NAMESPACE
 from routers.v2.posts.schemas import GetPostResponse
 
 pytest_plugins = ("pytest_asyncio",)
@@ -72,26 +74,70 @@ async def test_get_post_increase_view(client, mocker):
     INPUT:
         Get post twice
     OUTPUT:
-        - Get post successfully
-        - View increase after call
+        - Get post successfully, second call is served from response cache
+        - View increase on every call
     """
-    post1 = _make_get_post_response(view=1)
-    post2 = _make_get_post_response(view=2)
+    post = _make_get_post_response(view=1)
+    mocker.patch.object(post_crud, "get_one", new_callable=AsyncMock, return_value=post)
+    increment = mocker.patch.object(post_view_counter, "increment")
 
+    response = client.get("/api/v2/posts/65d76b73cbc29b3c618ec673")
+    assert response.status_code == 200
+    assert response.json()["view"] == 1
+
+    response = client.get("/api/v2/posts/65d76b73cbc29b3c618ec673")
+    assert response.status_code == 200
+    assert response.json()["view"] == 1
+    assert post_crud.get_one.await_count == 1
+    assert increment.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_post_not_modified_with_etag(client, mocker):
+    """
+    INPUT:
+        Get post, then get again with the ETag in If-None-Match
+    OUTPUT:
+        Second call is 304 without body
+    """
+    mocker.patch.object(
+        post_crud, "get_one", new_callable=AsyncMock, return_value=_make_get_post_response()
+    )
+
+    response = client.get("/api/v2/posts/65d76b73cbc29b3c618ec673")
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v2/posts/65d76b73cbc29b3c618ec673", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_get_post_refetch_after_invalidate(client, mocker):
+    """
+    INPUT:
+        Get post, invalidate posts response cache (admin write), get post again
+    OUTPUT:
+        Post is fetched again with the new content
+    """
     mocker.patch.object(
         post_crud,
         "get_one",
         new_callable=AsyncMock,
-        side_effect=[post1, post2],
+        side_effect=[
+            _make_get_post_response(title="Old title"),
+            _make_get_post_response(title="New title"),
+        ],
     )
 
     response = client.get("/api/v2/posts/65d76b73cbc29b3c618ec673")
-    assert response.status_code == 200
-    assert response.json()["view"] == 1
+    assert response.json()["title"] == "Old title"
+
+    await post_response_cache.invalidate(POSTS_NAMESPACE)
 
     response = client.get("/api/v2/posts/65d76b73cbc29b3c618ec673")
-    assert response.status_code == 200
-    assert response.json()["view"] == 2
+    assert response.json()["title"] == "New title"
 
 
 @pytest.mark.asyncio
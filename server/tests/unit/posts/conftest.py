@@ -2,9 +2,16 @@ import pytest
 from beanie import PydanticObjectId
 
 from models import Posts, Users, UserRoleEnum
+from routers.v2.posts.crud import post_count_cache, post_response_cache
 from schemas.common_types import OtherPostInfo
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_post_response_cache():
+    post_response_cache.clear_local()
+    post_count_cache.clear_local()
+
+
 @pytest.fixture(scope="function", autouse=True)
 async def create_post_data(clean_db):
     await clean_db
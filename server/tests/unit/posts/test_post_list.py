@@ -3,8 +3,17 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from models import Posts
+from models.news.posts import to_deadline
 from routers.v2.posts.api import post_crud
-from routers.v2.posts.schemas import GetPostListResponse
+from routers.v2.posts.crud import (
+    PostListProject,
+    invalidate_post_caches,
+    post_count_cache,
+    set_is_expired,
+)
+from routers.v2.posts.schemas import GetPostListResponse, GetPostListParams
+from schemas.common_types import OtherPostInfo
 
 pytest_plugins = ("pytest_asyncio",)
 
@@ -107,6 +116,33 @@ async def test_get_post_list_with_filter_successfully(client, mocker):
     assert response.json() == [EXPECTED_POST_JSON]
 
 
+@pytest.mark.asyncio
+async def test_get_post_list_cached_by_normalized_params(client, mocker):
+    """
+    INPUT:
+        Get post list, then the same page with default params spelled out in another order
+    OUTPUT:
+        Post list is fetched once, pagination headers are kept on the cached response
+    """
+    mocker.patch.object(
+        post_crud,
+        "get_list",
+        new_callable=AsyncMock,
+        return_value=([_make_post_list_response()], 1),
+    )
+
+    first = client.get("/api/v2/posts", params={"match_tags": "Câu lạc bộ"})
+    second = client.get(
+        "/api/v2/posts", params={"per_page": 100, "match_tags": "Câu lạc bộ", "page": 1}
+    )
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers.get("x-total-count") == "1"
+    assert post_crud.get_list.await_count == 1
+
+
 @pytest.mark.asyncio
 async def test_get_related_post_list_successfully(client, mocker):
     """
@@ -125,3 +161,196 @@ async def test_get_related_post_list_successfully(client, mocker):
     response = client.get("/api/v2/posts/65d76b73cbc29b3c618ec673/_related")
     assert response.status_code == 200
     assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_search_post_list_run_pipeline_once_and_cache_total(mocker):
+    """
+    INPUT:
+        Search post list twice with the same filter
+    OUTPUT:
+        - First call get hits and total from one $facet execution
+        - Second call reuse cached total and only get hits
+    """
+    raw_post = {
+        "id": "65d76b73cbc29b3c618ec673",
+        "created_at": datetime.datetime(1111, 11, 11, 11, 11, 11),
+        "title": "Some title",
+        "description": "Some description",
+        "banner_img": BANNER_IMG,
+        "tags": ["Câu lạc bộ", "Tình nguyện"],
+        "view": 1,
+        "keywords": ["keyword 1", "keyword 2", "keyword 3"],
+        "deadline": None,
+    }
+    aggregate = mocker.patch.object(post_crud.model, "aggregate")
+    aggregate.return_value.to_list = AsyncMock(
+        side_effect=[
+            [{"items": [raw_post], "total": [{"count": 21}]}],
+            [raw_post],
+        ]
+    )
+    post_count_cache.clear_local()
+    params = GetPostListParams(match_search="tình nguyện", page=1, per_page=20)
+
+    posts, total = await post_crud.get_list(params)
+    assert total == 21
+    assert posts[0].slug == "some-title"
+    first_pipeline = aggregate.call_args_list[0].args[0]
+    assert "$search" in first_pipeline[0]
+    assert "$facet" in first_pipeline[-1]
+
+    params.page = 2
+    posts, total = await post_crud.get_list(params)
+    assert total == 21
+    second_pipeline = aggregate.call_args_list[1].args[0]
+    assert not any("$facet" in stage for stage in second_pipeline)
+    assert {"$skip": 20} in second_pipeline
+
+
+@pytest.mark.asyncio
+async def test_post_list_total_invalidated_with_post_caches(mocker):
+    """
+    INPUT:
+        Get a post list, invalidate post caches (admin write), get it again
+    OUTPUT:
+        Total is counted again after the invalidation
+    """
+    aggregate = mocker.patch.object(post_crud.model, "aggregate")
+    aggregate.return_value.to_list = AsyncMock(
+        side_effect=[
+            [{"items": [], "total": [{"count": 21}]}],
+            [{"items": [], "total": [{"count": 22}]}],
+        ]
+    )
+    params = GetPostListParams(match_tags="a", page=1, per_page=20)
+
+    assert (await post_crud.get_list(params))[1] == 21
+    await invalidate_post_caches()
+    assert (await post_crud.get_list(params))[1] == 22
+    assert "$facet" in aggregate.call_args_list[1].args[0][-1]
+
+
+def test_set_is_expired_from_one_now(mocker):
+    """
+    INPUT:
+        Posts with deadline before today, today, after today and without deadline
+    OUTPUT:
+        Only the post with deadline before today is expired, now is read once
+    """
+    vn_now = mocker.patch(
+        "routers.v2.posts.crud.vn_now", return_value=datetime.datetime(2025, 6, 15, 10, 0)
+    )
+    posts = [
+        PostListProject(**{**_make_post_list_response().model_dump(), "deadline": deadline})
+        for deadline in ("2025-06-14", "2025-06-15", "2025-06-16", None)
+    ]
+
+    set_is_expired(posts)
+
+    assert [post.is_expired for post in posts] == [True, False, False, False]
+    assert vn_now.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_post_slug_stored_on_insert(init_db):
+    """
+    INPUT:
+        Insert a post without slug
+    OUTPUT:
+        Slug generated from title is stored on the post
+    """
+    await init_db
+    post = Posts(
+        discord_post_id=0,
+        title="Some title",
+        description="Some description",
+        content="Some content",
+        author="news.betterme.dev",
+        keywords=[],
+        og_img=BANNER_IMG,
+    )
+    await post.insert()
+
+    assert (await Posts.get(post.id)).slug == "some-title"
+
+
+def test_build_post_list_query_index_friendly(mocker):
+    """
+    INPUT:
+        Params with one tag, several tags and match_is_expired true/false
+    OUTPUT:
+        Equality/$in on tags, one deadline range without $or/$elemMatch
+    """
+    mocker.patch("models.news.posts.vn_now", return_value=datetime.datetime(2025, 6, 15, 10, 0))
+    today = datetime.datetime(2025, 6, 15)
+
+    find_queries, agg_queries = Posts.build_query(
+        GetPostListParams(match_tags="a", match_is_expired=False)
+    )
+    assert find_queries == {"tags": "a", "deadline": {"$not": {"$lt": today}}}
+    assert agg_queries == []
+
+    find_queries, _ = Posts.build_query(GetPostListParams(match_tags="a,b", match_is_expired=True))
+    assert find_queries == {"tags": {"$in": ["a", "b"]}, "deadline": {"$lt": today}}
+
+
+def test_to_deadline():
+    """
+    INPUT:
+        ISO string, date, datetime, empty and invalid deadlines
+    OUTPUT:
+        Midnight datetime, None when there is no valid deadline
+    """
+    assert to_deadline("2025-06-15") == datetime.datetime(2025, 6, 15)
+    assert to_deadline("2025-06-15T08:00:00") == datetime.datetime(2025, 6, 15)
+    assert to_deadline(datetime.date(2025, 6, 15)) == datetime.datetime(2025, 6, 15)
+    assert to_deadline(datetime.datetime(2025, 6, 15, 8)) == datetime.datetime(2025, 6, 15)
+    assert to_deadline(None) is None
+    assert to_deadline("") is None
+    assert to_deadline("not a date") is None
+
+
+@pytest.mark.asyncio
+async def test_post_deadline_stored_on_insert(init_db):
+    """
+    INPUT:
+        Insert a post with other_information.deadline
+    OUTPUT:
+        Typed deadline is stored on the post
+    """
+    await init_db
+    post = Posts(
+        discord_post_id=0,
+        title="Some title",
+        description="Some description",
+        content="Some content",
+        author="news.betterme.dev",
+        keywords=[],
+        og_img=BANNER_IMG,
+        other_information=OtherPostInfo(deadline=datetime.date(2025, 6, 15)),
+    )
+    await post.insert()
+
+    assert (await Posts.get(post.id)).deadline == datetime.datetime(2025, 6, 15)
+
+
+def test_post_list_params_without_crud_cursor_fields():
+    """
+    INPUT:
+        Query params of the post list
+    OUTPUT:
+        count_mode/after of BaseCRUD.get_list are not accepted (ignored by PostCRUD.get_list)
+    """
+    assert {"page", "per_page"} <= GetPostListParams.model_fields.keys()
+    assert not {"count_mode", "after"} & GetPostListParams.model_fields.keys()
+
+
+def test_posts_without_beanie_query_cache():
+    """
+    INPUT:
+        Settings of Posts
+    OUTPUT:
+        Beanie query cache is off, a read after invalidate_post_caches is not served stale
+    """
+    assert not Posts.get_settings().use_cache
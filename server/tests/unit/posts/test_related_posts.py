@@ -0,0 +1,98 @@
+import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from base.custom.http_status import NotFound
+from models import RelatedPosts
+from routers.v2.posts.api import post_crud
+from routers.v2.posts.crud import build_related_posts
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _make_item(post_id, deadline=None, overlap=1):
+    return {
+        "id": post_id,
+        "created_at": datetime.datetime(2025, 1, 1),
+        "title": "Some title",
+        "description": "Some description",
+        "slug": "some-title",
+        "view": 1,
+        "tags": ["Tình nguyện"],
+        "keywords": [],
+        "deadline": deadline,
+        "overlap": overlap,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_related_list_read_snapshot(init_db, mocker):
+    """
+    INPUT:
+        Snapshot with the post itself, an expired post and 4 other posts
+    OUTPUT:
+        First 3 not expired posts other than the post itself, no post aggregation
+    """
+    await init_db
+    post_id = ObjectId()
+    other_ids = [ObjectId() for _ in range(4)]
+    expired_id = ObjectId()
+    await RelatedPosts(
+        post_id=post_id,
+        tags=["Tình nguyện"],
+        related=[
+            _make_item(post_id, overlap=2),
+            _make_item(expired_id, deadline="2000-01-01", overlap=2),
+            *[_make_item(other_id, deadline="2999-01-01") for other_id in other_ids],
+        ],
+    ).insert()
+    aggregate = mocker.patch.object(post_crud.model, "aggregate")
+
+    posts = await post_crud.get_related_list(str(post_id))
+
+    assert [post.id for post in posts] == other_ids[:3]
+    aggregate.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_related_list_of_unknown_post(init_db):
+    """
+    INPUT:
+        Get related posts of an invalid id and of a post that does not exist
+    OUTPUT:
+        Not found error
+    """
+    await init_db
+
+    with pytest.raises(NotFound):
+        await post_crud.get_related_list("not-an-id")
+    with pytest.raises(NotFound):
+        await post_crud.get_related_list(str(ObjectId()))
+
+
+@pytest.mark.asyncio
+async def test_build_related_posts_rank_and_store(init_db, mocker):
+    """
+    INPUT:
+        Build related posts of a post with 2 tags
+    OUTPUT:
+        Candidates match shared tags without the post itself, ranked by overlap then recency,
+        snapshot is stored
+    """
+    await init_db
+    post_id = ObjectId()
+    items = [_make_item(ObjectId(), overlap=2)]
+    aggregate = mocker.patch.object(post_crud.model, "aggregate")
+    aggregate.return_value.to_list = AsyncMock(return_value=items)
+
+    assert await build_related_posts(post_id, ["Học bổng", "Tình nguyện"]) == items
+
+    pipeline = aggregate.call_args.args[0]
+    assert pipeline[0]["$match"]["_id"] == {"$ne": post_id}
+    assert pipeline[0]["$match"]["tags"] == {"$in": ["Học bổng", "Tình nguyện"]}
+    assert pipeline[2] == {"$sort": {"overlap": -1, "id": -1}}
+    snapshot = await RelatedPosts.find_one(RelatedPosts.post_id == post_id)
+    assert snapshot.tags == ["Học bổng", "Tình nguyện"]
+    assert [item["id"] for item in snapshot.related] == [items[0]["id"]]
@@ -0,0 +1,187 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+
+from base.custom.crud import BaseCRUD, CountModeEnum, encode_cursor, decode_cursor
+from base.custom.http_status import BadRequest
+from models import Tasks
+from routers.v2.tasks.api import task_crud
+from routers.v2.tasks.schemas import GetTaskResponse
+
+pytest_plugins = ("pytest_asyncio",)
+
+USER_ID = "111111111111111111111111"
+
+
+def _mock_find(mocker, aggregate_result):
+    query = MagicMock()
+    query.aggregate.return_value.to_list = AsyncMock(return_value=aggregate_result)
+    mocker.patch.object(Tasks, "find", return_value=query)
+    return query
+
+
+@pytest.mark.asyncio
+async def test_get_list_return_items_and_total_in_one_aggregation(init_db, mocker):
+    """
+    INPUT:
+        Get list with exact count
+    OUTPUT:
+        Items and total come from a single $facet aggregation
+    """
+    await init_db
+    task_id = ObjectId()
+    query = _mock_find(
+        mocker,
+        [
+            {
+                "items": [{"_id": task_id, "user_id": USER_ID, "title": "Some task"}],
+                "total": [{"count": 11}],
+            }
+        ],
+    )
+
+    items, total, next_cursor = await BaseCRUD(Tasks).get_list(
+        skip=10, limit=10, match_user_id=USER_ID
+    )
+
+    assert total == 11
+    assert [item.id for item in items] == [task_id]
+    assert next_cursor is None
+    pipeline = query.aggregate.call_args.args[0]
+    assert pipeline[0] == {"$sort": {"_id": -1}}
+    assert pipeline[1]["$facet"]["items"] == [{"$skip": 10}, {"$limit": 10}]
+    query.count.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_list_with_projection_model(init_db, mocker):
+    """
+    INPUT:
+        Get list with the response schema as projection model
+    OUTPUT:
+        Only fields of the schema are projected, items are the schema with string id
+    """
+    await init_db
+    task_id = ObjectId()
+    query = _mock_find(
+        mocker,
+        [
+            {
+                "items": [{"_id": task_id, "id": task_id, "title": "Some task"}],
+                "total": [{"count": 1}],
+            }
+        ],
+    )
+
+    items, total, _ = await BaseCRUD(Tasks).get_list(
+        projection_model=GetTaskResponse, match_user_id=USER_ID
+    )
+
+    assert total == 1
+    assert isinstance(items[0], GetTaskResponse)
+    assert items[0].id == str(task_id)
+    projection = query.aggregate.call_args.args[0][1]["$facet"]["items"][-1]["$project"]
+    assert projection["id"] == "$_id"
+    assert projection["title"] == "$title"
+    assert "user_id" not in projection
+
+
+def test_task_response_do_not_mutate_document():
+    """
+    INPUT:
+        Validate a task response from a Tasks document
+    OUTPUT:
+        Response id is a string, document id is untouched
+    """
+    task = Tasks(id=ObjectId(), user_id=USER_ID, title="Some task")
+
+    response = GetTaskResponse.model_validate(task)
+
+    assert response.id == str(task.id)
+    assert isinstance(task.id, ObjectId)
+
+
+@pytest.mark.asyncio
+async def test_get_list_return_zero_total_when_no_match(init_db, mocker):
+    """
+    INPUT:
+        Get list that match nothing
+    OUTPUT:
+        Empty items and total equal 0
+    """
+    await init_db
+    _mock_find(mocker, [{"items": [], "total": []}])
+
+    items, total, _ = await BaseCRUD(Tasks).get_list(match_user_id=USER_ID)
+
+    assert items == []
+    assert total == 0
+
+
+@pytest.mark.asyncio
+async def test_get_list_without_count_hide_total_headers(auth_client, mocker):
+    """
+    INPUT:
+        Get task list that skip counting
+    OUTPUT:
+        No x-total-count header, page headers still set
+    """
+    mocker.patch.object(
+        task_crud,
+        "get_list",
+        new_callable=AsyncMock,
+        return_value=([], None, "ZfG0cXaMrTwGXCt5"),
+    )
+
+    response = auth_client.get(
+        "/api/v2/tasks/", params={"page": 2, "per_page": 10, "count_mode": "none"}
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "x-total-count" not in response.headers
+    assert response.headers.get("x-page") == "2"
+    assert response.headers.get("x-per-page") == "10"
+    assert response.headers.get("x-next-cursor") == "ZfG0cXaMrTwGXCt5"
+    assert task_crud.get_list.call_args.kwargs["count_mode"] == CountModeEnum.NONE
+
+
+@pytest.mark.asyncio
+async def test_get_list_after_cursor_use_range_scan(init_db, mocker):
+    """
+    INPUT:
+        Get list with cursor of previous page
+    OUTPUT:
+        Query filter _id lower than cursor, no skip, return cursor of the last item
+    """
+    await init_db
+    last_id = ObjectId()
+    tasks = [Tasks(id=ObjectId(), user_id=USER_ID, title="Some task") for _ in range(2)]
+    find = mocker.patch.object(Tasks, "find")
+    query = find.return_value.sort.return_value.limit.return_value
+    query.to_list = AsyncMock(return_value=tasks)
+
+    items, total, next_cursor = await BaseCRUD(Tasks).get_list(
+        limit=2,
+        after=encode_cursor(last_id),
+        count_mode=CountModeEnum.NONE,
+        match_user_id=USER_ID,
+    )
+
+    assert items == tasks
+    assert total is None
+    assert decode_cursor(next_cursor) == tasks[-1].id
+    range_filter = find.call_args.args[-1]
+    assert range_filter == {"_id": {"$lt": last_id}}
+    find.return_value.sort.return_value.skip.assert_not_called()
+
+
+def test_decode_invalid_cursor():
+    """
+    INPUT:
+        Decode a malformed cursor
+    OUTPUT:
+        Bad request error
+    """
+    with pytest.raises(BadRequest):
+        decode_cursor("not-a-cursor")
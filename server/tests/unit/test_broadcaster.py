@@ -0,0 +1,129 @@
+import pytest
+
+from utils.broadcaster import Broadcaster, SlowConsumerPolicyEnum, close_broadcasters
+from utils.pubsub import PubSubBackend
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class FakePubSub(PubSubBackend):
+    """
+    Shared by broadcasters of fake workers, record every published message
+    """
+
+    def __init__(self):
+        self.handlers = []
+        self.published = []
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+        for handler_channel, handler in self.handlers:
+            if handler_channel == channel:
+                handler(message)
+
+    async def subscribe(self, channel, handler):
+        self.handlers.append((channel, handler))
+
+
+@pytest.mark.asyncio
+async def test_publish_serialize_once_for_all_subscribers():
+    """
+    INPUT:
+        Publish an event to 2 subscribers
+    OUTPUT:
+        Both subscribers buffer the same encoded message
+    """
+    broadcaster = Broadcaster()
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    await broadcaster.publish("room_created", {"livekit_room_name": "room-1"})
+
+    assert first.buffer[0][1] is second.buffer[0][1]
+    assert b"event: room_created" in first.buffer[0][1]
+    assert broadcaster.stats()["subscriber_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_policy():
+    """
+    INPUT:
+        Publish 3 events to subscribers with buffer size 2 that never read
+    OUTPUT:
+        DISCONNECT policy close the subscriber, DROP_OLDEST keep the 2 newest events
+    """
+    disconnect = Broadcaster(buffer_size=2, policy=SlowConsumerPolicyEnum.DISCONNECT)
+    drop_oldest = Broadcaster(buffer_size=2, policy=SlowConsumerPolicyEnum.DROP_OLDEST)
+    disconnected_subscriber = disconnect.subscribe()
+    dropping_subscriber = drop_oldest.subscribe()
+
+    for index in range(3):
+        await disconnect.publish("member_joined", {"index": index})
+        await drop_oldest.publish("member_joined", {"index": index})
+
+    assert disconnected_subscriber.closed
+    assert disconnect.stats()["subscriber_count"] == 0
+    assert disconnect.stats()["disconnected_count"] == 1
+    assert [event_id.split("-")[1] for event_id, _ in dropping_subscriber.buffer] == ["2", "3"]
+    assert drop_oldest.stats()["max_lag"] == 2
+    assert drop_oldest.stats()["dropped_event_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_after_last_event_id():
+    """
+    INPUT:
+        Reconnect with id of the first event after 3 events were published
+    OUTPUT:
+        The 2 missed events are replayed, unknown ids replay nothing
+    """
+    broadcaster = Broadcaster()
+    for index in range(3):
+        await broadcaster.publish("member_joined", {"index": index})
+    event_ids = [event_id for event_id, _ in broadcaster._recent_events]
+
+    subscriber = broadcaster.subscribe(last_event_id=event_ids[0])
+
+    assert [event_id for event_id, _ in subscriber.buffer] == event_ids[1:]
+    assert not broadcaster.subscribe(last_event_id="unknown-1").buffer
+
+
+@pytest.mark.asyncio
+async def test_publish_reach_subscribers_of_other_workers():
+    """
+    INPUT:
+        2 workers share a pub/sub backend, publish an event on the first worker
+    OUTPUT:
+        Subscriber of the second worker receive it with the same event id
+    """
+    backend = FakePubSub()
+    worker_a = Broadcaster("rooms", backend=backend)
+    worker_b = Broadcaster("rooms", backend=backend)
+    await worker_b.start()
+    subscriber = worker_b.subscribe()
+
+    await worker_a.publish("room_deleted", {"livekit_room_name": "room-1"})
+
+    assert len(backend.published) == 1
+    event_id, message = subscriber.buffer[0]
+    assert f"id: {event_id}".encode() in message
+    assert worker_a.stats()["last_event_id"] == event_id
+
+
+@pytest.mark.asyncio
+async def test_close_broadcasters_on_shutdown():
+    """
+    INPUT:
+        A started broadcaster with a subscriber, then app shutdown
+    OUTPUT:
+        Subscriber is closed and the backend is closed
+    """
+    backend = FakePubSub()
+    broadcaster = Broadcaster(backend=backend)
+    subscriber = broadcaster.subscribe()
+    await broadcaster.start()
+
+    await close_broadcasters()
+
+    assert subscriber.closed
+    assert not broadcaster.subscribers
+    assert not broadcaster._started
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.cache import SharedCache, TTLCache
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_ttl_cache_evict_least_recently_used():
+    """
+    INPUT:
+        Cache of size 2, read the first key then add a third key
+    OUTPUT:
+        Second key is evicted
+    """
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_concurrent_expired_reads():
+    """
+    INPUT:
+        Threads reading and setting the same expired key concurrently
+    OUTPUT:
+        No KeyError, every read misses
+    """
+    cache = TTLCache(max_size=2, ttl=60)
+
+    def read_expired(_):
+        cache.set("token", 1, ttl=0)
+        return cache.get("token")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(read_expired, range(2000)))
+
+    assert results == [None] * 2000
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_invalidate_namespace():
+    """
+    INPUT:
+        Cache 2 namespaces without redis, invalidate one of them
+    OUTPUT:
+        Only entries of the invalidated namespace are gone
+    """
+    cache = SharedCache("test")
+    await cache.set(["user:1"], "2025", [1])
+    await cache.set(["user:2"], "2025", [2])
+
+    await cache.invalidate("user:1")
+
+    assert await cache.get(["user:1"], "2025") is None
+    assert await cache.get(["user:2"], "2025") == [2]
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_without_redis_expire_after_unshared_ttl(mocker):
+    """
+    INPUT:
+        Cache with ttl=600 without redis, read 31 seconds after set
+    OUTPUT:
+        Entry expired (invalidate does not reach other workers without redis)
+    """
+    monotonic = mocker.patch("utils.cache.time.monotonic", return_value=1000.0)
+    cache = SharedCache("test_unshared", ttl=600, unshared_ttl=30)
+    await cache.set(["user:1"], "settings", {"a": 1})
+    assert await cache.get(["user:1"], "settings") == {"a": 1}
+
+    monotonic.return_value = 1031.0
+    assert await cache.get(["user:1"], "settings") is None
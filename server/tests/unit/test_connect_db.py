@@ -0,0 +1,78 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import models
+from base.settings import IndexBuildEnum
+from models import Pomodoros, ShortenLinks, StudyTimeRollups
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_connect_db_defer_index_build(monkeypatch):
+    """
+    INPUT:
+        Connect db with deferred index build
+    OUTPUT:
+        Models are usable once connected, unique indexes are built before serving,
+        the other indexes are built by the background task
+    """
+    monkeypatch.setattr(models, "client", AsyncMongoMockClient())
+
+    await models.connect_db(IndexBuildEnum.DEFERRED.value)
+    collection = Pomodoros.get_pymongo_collection()
+    assert collection.database.name == "betterme_study"
+    assert "user_id_start_at_idx" not in await collection.index_information()
+    assert "link_name_1" in await ShortenLinks.get_pymongo_collection().index_information()
+    assert (
+        "source_owner_day_unique_idx"
+        in await StudyTimeRollups.get_pymongo_collection().index_information()
+    )
+
+    await models.index_build_task
+    assert "user_id_start_at_idx" in await collection.index_information()
+
+
+@pytest.mark.asyncio
+async def test_connect_db_skip_index_build(monkeypatch):
+    """
+    INPUT:
+        Connect db with index build skipped
+    OUTPUT:
+        No index is built, no background task is started
+    """
+    monkeypatch.setattr(models, "client", AsyncMongoMockClient())
+    monkeypatch.setattr(models, "index_build_task", None)
+
+    await models.connect_db(IndexBuildEnum.SKIP.value)
+
+    assert models.index_build_task is None
+    assert (
+        "user_id_start_at_idx" not in await Pomodoros.get_pymongo_collection().index_information()
+    )
+
+
+@pytest.mark.asyncio
+async def test_build_indexes_raise_when_a_model_fails(monkeypatch):
+    """
+    INPUT:
+        Deferred index build, indexes of one model can not be built
+    OUTPUT:
+        Indexes of other models are still built, the build task fails naming the model
+    """
+    monkeypatch.setattr(models, "client", AsyncMongoMockClient())
+    initializer = await models.init_database(
+        "betterme_study", models.pomodoro_document_models, skip_indexes=True
+    )
+    init_indexes = initializer.init_indexes
+
+    async def fail_pomodoros(document_model):
+        if document_model is Pomodoros:
+            raise ValueError("E11000 duplicate key error")
+        await init_indexes(document_model)
+
+    monkeypatch.setattr(initializer, "init_indexes", fail_pomodoros)
+
+    with pytest.raises(RuntimeError, match="Pomodoros"):
+        await models.build_indexes([initializer])
+    assert "user_id_index_idx" in await models.TodoList.get_pymongo_collection().index_information()
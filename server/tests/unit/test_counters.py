@@ -0,0 +1,92 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+
+from utils.counters import BufferedCounter, counters
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.fixture
+def counter():
+    model = MagicMock(__name__="Posts")
+    model.get_pymongo_collection.return_value.bulk_write = AsyncMock()
+    counter = BufferedCounter(model, "view")
+    yield counter
+    counters.remove(counter)
+
+
+@pytest.mark.asyncio
+async def test_flush_coalesce_increments(counter):
+    """
+    INPUT:
+        3 views of a post, 1 view of another post
+    OUTPUT:
+        One bulk_write with one $inc per post, nothing pending after flush
+    """
+    hot_post_id, post_id = ObjectId(), ObjectId()
+    for _ in range(3):
+        counter.increment(hot_post_id)
+    counter.increment(post_id)
+
+    assert await counter.flush() == 2
+
+    bulk_write = counter.model.get_pymongo_collection.return_value.bulk_write
+    requests = bulk_write.call_args.args[0]
+    assert [(request._filter, request._doc) for request in requests] == [
+        ({"_id": hot_post_id}, {"$inc": {"view": 3}}),
+        ({"_id": post_id}, {"$inc": {"view": 1}}),
+    ]
+    assert counter.pending(hot_post_id) == 0
+    assert await counter.flush() == 0
+    bulk_write.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_flush_error_keep_increments(counter):
+    """
+    INPUT:
+        Flush fail, then a new view arrives
+    OUTPUT:
+        Failed increments are kept and merged with the new one
+    """
+    post_id = ObjectId()
+    counter.increment(post_id, 2)
+    counter.model.get_pymongo_collection.return_value.bulk_write.side_effect = Exception("down")
+
+    assert await counter.flush() == 0
+    counter.increment(post_id)
+
+    assert counter.pending(post_id) == 3
+
+
+@pytest.mark.asyncio
+async def test_stop_during_flush_keep_increments(counter):
+    """
+    INPUT:
+        Stop the counter while its periodic flush is waiting for bulk_write
+    OUTPUT:
+        Cancelled flush gives back its increments, the final flush writes them
+    """
+    post_id = ObjectId()
+    counter.flush_interval = 0
+    flushing = asyncio.Event()
+    written = []
+
+    async def bulk_write(requests, ordered):
+        if not flushing.is_set():
+            flushing.set()
+            await asyncio.Event().wait()
+        written.extend(request._doc for request in requests)
+
+    counter.model.get_pymongo_collection.return_value.bulk_write = bulk_write
+    counter.increment(post_id, 2)
+    counter.start()
+    await flushing.wait()
+
+    await counter.stop()
+
+    assert written == [{"$inc": {"view": 2}}]
+    assert counter.pending(post_id) == 0
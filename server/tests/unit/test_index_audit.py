@@ -0,0 +1,58 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from utils.index_audit import QueryShape, audit_indexes, get_plan_stages
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_get_plan_stages_walk_nested_plans():
+    """
+    INPUT:
+        Winning plan with a FETCH over an OR of 2 index scans, nested in queryPlan
+    OUTPUT:
+        All stages from the root to the leaves
+    """
+    plan = {
+        "queryPlan": {
+            "stage": "FETCH",
+            "inputStage": {
+                "stage": "OR",
+                "inputStages": [{"stage": "IXSCAN"}, {"stage": "IXSCAN"}],
+            },
+        }
+    }
+    assert get_plan_stages(plan) == ["FETCH", "OR", "IXSCAN", "IXSCAN"]
+
+
+@pytest.mark.asyncio
+async def test_audit_indexes_flag_collection_scan_and_in_memory_sort():
+    """
+    INPUT:
+        3 query shapes, explained as index scan, collection scan and in-memory sort
+    OUTPUT:
+        Only the index scan is reported as served by an index
+    """
+    winning_plans = [
+        {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+        {"stage": "COLLSCAN"},
+        {"stage": "SORT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}},
+    ]
+    query_shapes = []
+    for index, winning_plan in enumerate(winning_plans):
+        cursor = MagicMock()
+        cursor.limit.return_value = cursor
+        cursor.sort.return_value = cursor
+        cursor.explain = AsyncMock(return_value={"queryPlanner": {"winningPlan": winning_plan}})
+        model = MagicMock()
+        model.get_pymongo_collection.return_value.find.return_value = cursor
+        query_shapes.append(QueryShape(f"shape {index}", model, {"user_id": ""}, [("_id", -1)]))
+
+    results = await audit_indexes(query_shapes)
+
+    assert [(r["collection_scan"], r["in_memory_sort"]) for r in results] == [
+        (False, False),
+        (True, False),
+        (False, True),
+    ]
@@ -0,0 +1,87 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from livekit import api
+
+from routers.v2.pomodoro_rooms.crud import PomodoroRoomCRUD
+
+pytest_plugins = ("pytest_asyncio",)
+
+USER_ID = "111111111111111111111111"
+
+
+def _livekit_room(name: str, room_name: str = "Study room") -> api.Room:
+    return api.Room(
+        name=name,
+        metadata=json.dumps({"room_name": room_name, "created_by": USER_ID}),
+        max_participants=10,
+        num_participants=1,
+        creation_time=1735689600000,
+    )
+
+
+def _crud_with_rooms(rooms) -> PomodoroRoomCRUD:
+    crud = PomodoroRoomCRUD()
+    crud._livekit = MagicMock()
+    crud._livekit.room.list_rooms = AsyncMock(return_value=SimpleNamespace(rooms=rooms))
+    return crud
+
+
+@pytest.mark.asyncio
+async def test_get_list_served_from_registry():
+    """
+    INPUT:
+        Get room list twice, then a room is finished
+    OUTPUT:
+        LiveKit is listed once, finished room is removed without listing again
+    """
+    crud = _crud_with_rooms([_livekit_room("room-1"), _livekit_room("room-2")])
+
+    assert len(await crud.get_list()) == 2
+    crud.remove_room("room-1")
+    rooms = await crud.get_list()
+
+    assert [room["livekit_room_name"] for room in rooms] == ["room-2"]
+    crud.livekit.room.list_rooms.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_room_by_name_miss_lookup_single_room():
+    """
+    INPUT:
+        Get a room that is not in the registry twice
+    OUTPUT:
+        LiveKit is asked once, filtered by the room name
+    """
+    crud = _crud_with_rooms([_livekit_room("room-1")])
+
+    room = await crud.get_room_by_name("room-1")
+    await crud.get_room_by_name("room-1")
+
+    assert room["room_name"] == "Study room"
+    crud.livekit.room.list_rooms.assert_awaited_once_with(api.ListRoomsRequest(names=["room-1"]))
+
+
+@pytest.mark.asyncio
+async def test_update_room_list_livekit_once():
+    """
+    INPUT:
+        Update room name by its creator
+    OUTPUT:
+        LiveKit is listed once, registry hold the updated room
+    """
+    crud = _crud_with_rooms([_livekit_room("room-1")])
+    crud.livekit.room.update_room_metadata = AsyncMock(
+        return_value=_livekit_room("room-1", room_name="New name")
+    )
+
+    room = await crud.update(
+        "room-1", SimpleNamespace(room_name="New name", pomodoro_settings=None), USER_ID
+    )
+
+    assert room["room_name"] == "New name"
+    assert room["num_participants"] == 1
+    assert (await crud.get_room_by_name("room-1"))["room_name"] == "New name"
+    crud.livekit.room.list_rooms.assert_awaited_once()
@@ -0,0 +1,162 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+import scripts
+from base.custom.http_status import BadRequest
+from models import ShortenLinks
+from routers.v2.shorten_links.api import shorten_link_crud
+from routers.v2.shorten_links.crud import access_counter, redirect_cache
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_redirect_count_access_in_memory(init_db, client, mocker):
+    """
+    INPUT:
+        Open a shorten link twice
+    OUTPUT:
+        Redirect to the link, link read once, 2 pending accesses, no write per click
+    """
+    await init_db
+    redirect_cache.clear()
+    link = ShortenLinks(id=ObjectId(), link_name="abc", redirect_link="https://betterme.dev")
+    get_by_link_name = mocker.patch.object(
+        shorten_link_crud, "get_by_link_name", new_callable=AsyncMock, return_value=link
+    )
+    link_set = mocker.patch.object(ShortenLinks, "set", new_callable=AsyncMock)
+
+    for _ in range(2):
+        response = client.get("/api/v2/shorten-links/abc", follow_redirects=False)
+        assert response.status_code == 302
+        assert response.headers["location"] == "https://betterme.dev"
+
+    assert access_counter.pending(link.id) == 2
+    get_by_link_name.assert_awaited_once()
+    link_set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unknown_link_cached_until_created(init_db, client, mocker):
+    """
+    INPUT:
+        Open an unknown link twice, create it, open it again
+    OUTPUT:
+        404 twice with one lookup, redirect after the link is created
+    """
+    await init_db
+    redirect_cache.clear()
+    link = ShortenLinks(id=ObjectId(), link_name="new", redirect_link="https://betterme.dev")
+    get_by_link_name = mocker.patch.object(
+        shorten_link_crud, "get_by_link_name", new_callable=AsyncMock, return_value=None
+    )
+    for _ in range(2):
+        assert client.get("/api/v2/shorten-links/new").status_code == 404
+    get_by_link_name.assert_awaited_once()
+
+    await shorten_link_crud.create_many(
+        [SimpleNamespace(redirect_link="https://betterme.dev", redirect_name="new")]
+    )
+    get_by_link_name.return_value = link
+
+    response = client.get("/api/v2/shorten-links/new", follow_redirects=False)
+    assert response.status_code == 302
+
+
+@pytest.mark.asyncio
+async def test_create_many_retry_only_collided_links(init_db, mocker):
+    """
+    INPUT:
+        Create 3 links, the generated name of the second one is taken
+    OUTPUT:
+        First insert_many has 3 links, retry insert only the second one with a new name
+    """
+    await init_db
+    inserted_batches = []
+
+    async def insert_many(documents, ordered):
+        inserted_batches.append([document.link_name for document in documents])
+        if len(inserted_batches) == 1:
+            raise BulkWriteError(
+                {"writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}]}
+            )
+
+    mocker.patch.object(ShortenLinks, "insert_many", side_effect=insert_many)
+    links = [SimpleNamespace(redirect_link="https://betterme.dev", redirect_name=None)] * 3
+
+    created = await shorten_link_crud.create_many(links)
+
+    assert len(inserted_batches) == 2
+    assert len(inserted_batches[0]) == 3
+    assert inserted_batches[1] == [created[1].link_name]
+    assert inserted_batches[1][0] != inserted_batches[0][1]
+    assert all(len(link.link_name) == 8 and link.link_name.isalnum() for link in created)
+
+
+@pytest.mark.asyncio
+async def test_create_many_taken_custom_name_insert_nothing(init_db, mocker):
+    """
+    INPUT:
+        Create 3 links, the custom name of the second one is taken after the check
+    OUTPUT:
+        Request fails, the 2 other links inserted by the unordered insert are deleted
+    """
+    await init_db
+    collection = ShortenLinks.get_pymongo_collection()
+
+    async def insert_many(documents, ordered):
+        await collection.insert_many(
+            [{"_id": document.id, "link_name": document.link_name} for document in documents[::2]]
+        )
+        raise BulkWriteError(
+            {"writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}]}
+        )
+
+    mocker.patch.object(ShortenLinks, "insert_many", side_effect=insert_many)
+    links = [
+        SimpleNamespace(redirect_link="https://betterme.dev", redirect_name=redirect_name)
+        for redirect_name in (None, "taken", None)
+    ]
+
+    with pytest.raises(BadRequest):
+        await shorten_link_crud.create_many(links)
+    assert await collection.count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_dedupe_link_names_keep_oldest(init_db, mocker):
+    """
+    INPUT:
+        3 links sharing a name (inserted before the unique index) and 1 unique link
+    OUTPUT:
+        Oldest link keeps the name, the 2 others get new distinct names
+    """
+    await init_db
+    collection = ShortenLinks.get_pymongo_collection()
+    await collection.drop_indexes()
+    link_ids = [ObjectId() for _ in range(3)]
+    await collection.insert_many(
+        [
+            *(
+                {"_id": link_id, "link_name": "abc", "redirect_link": "https://a.b"}
+                for link_id in link_ids
+            ),
+            {"_id": ObjectId(), "link_name": "xyz", "redirect_link": "https://a.b"},
+        ]
+    )
+
+    # $group result, grouping runs in MongoDB
+    aggregate = mocker.patch.object(ShortenLinks, "aggregate")
+    aggregate.return_value.to_list = AsyncMock(
+        return_value=[{"_id": "abc", "ids": link_ids[::-1], "count": 3}]
+    )
+
+    await scripts.dedupe_link_names()
+
+    link_names = {link["_id"]: link["link_name"] async for link in collection.find({})}
+    assert link_names[link_ids[0]] == "abc"
+    assert len(set(link_names.values())) == 4
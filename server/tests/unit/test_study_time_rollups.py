@@ -0,0 +1,249 @@
+import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from models import Pomodoros, PomodoroStatusEnum, UserDailyStudyTimes
+from models.pomodoro.study_time_rollups import (
+    RollupSourceEnum,
+    StudyTimeRollups,
+    split_minutes_by_day,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+USER_ID = "111111111111111111111111"
+
+
+def test_split_minutes_by_day_over_midnight():
+    """
+    INPUT:
+        Pomodoro start 10 minutes before midnight, last 25 minutes
+    OUTPUT:
+        10 minutes for the first day, 15 minutes for the next day
+    """
+    minutes_by_day = split_minutes_by_day(datetime.datetime(2025, 1, 31, 23, 50), 25 * 60)
+    assert minutes_by_day == {
+        datetime.datetime(2025, 1, 31): 10,
+        datetime.datetime(2025, 2, 1): 15,
+    }
+
+
+def test_build_pomodoro_increments():
+    """
+    INPUT:
+        2 completed pomodoros, 1 of them pass midnight of a new month
+    OUTPUT:
+        Minutes split to day buckets, pomodoro counted in the day it started
+    """
+    pomodoros = [
+        SimpleNamespace(
+            user_id=USER_ID, start_at=datetime.datetime(2025, 1, 31, 23, 50), duration=25 * 60
+        ),
+        SimpleNamespace(
+            user_id=USER_ID, start_at=datetime.datetime(2025, 1, 31, 8, 0), duration=25 * 60
+        ),
+    ]
+    increments = StudyTimeRollups.build_pomodoro_increments(pomodoros)[USER_ID]
+
+    assert increments[datetime.datetime(2025, 1, 31)] == [35, 2]
+    assert increments[datetime.datetime(2025, 2, 1)] == [15, 0]
+    assert len(increments) == 2
+
+
+def test_build_daily_minutes_increments():
+    """
+    INPUT:
+        Day rows from Pomodoros.daily_minutes in 2 months
+    OUTPUT:
+        Minutes and pomodoro count summed to day buckets
+    """
+    daily_minutes = [
+        {
+            "user_id": USER_ID,
+            "date": datetime.datetime(2025, 1, 31),
+            "study_time": 35.0,
+            "pomodoro_count": 2,
+        },
+        {
+            "user_id": USER_ID,
+            "date": datetime.datetime(2025, 2, 1),
+            "study_time": 15.0,
+            "pomodoro_count": 0,
+        },
+    ]
+    increments = StudyTimeRollups.build_daily_minutes_increments(daily_minutes)[USER_ID]
+
+    assert increments[datetime.datetime(2025, 1, 31)] == [35, 2]
+    assert increments[datetime.datetime(2025, 2, 1)] == [15, 0]
+
+
+@pytest.mark.asyncio
+async def test_pomodoro_daily_minutes_run_in_one_pipeline(init_db, mocker):
+    """
+    INPUT:
+        Get daily minutes of a user in a date range
+    OUTPUT:
+        Only completed pomodoros are matched, window widened for sections passing midnight,
+        rows are grouped by day in MongoDB
+    """
+    await init_db
+    rows = [
+        {
+            "user_id": USER_ID,
+            "date": datetime.datetime(2025, 2, 1),
+            "study_time": 15.0,
+            "pomodoro_count": 0,
+        }
+    ]
+    aggregate = mocker.patch.object(Pomodoros, "aggregate")
+    aggregate.return_value.to_list = AsyncMock(return_value=rows)
+    from_date = datetime.datetime(2025, 2, 1)
+
+    assert await Pomodoros.daily_minutes(USER_ID, from_date=from_date) == rows
+
+    pipeline = aggregate.call_args.args[0]
+    match = pipeline[0]["$match"]
+    assert match["status"] == PomodoroStatusEnum.COMPLETED.value
+    assert match["user_id"] == USER_ID
+    assert match["start_at"]["$gte"] == from_date - datetime.timedelta(hours=3)
+    assert any("$group" in stage for stage in pipeline)
+    assert "$project" in pipeline[1]
+
+
+@pytest.mark.asyncio
+async def test_get_daily_series_share_year_window_and_invalidate(init_db, mocker):
+    """
+    INPUT:
+        Get 2 different ranges in the same year, then add a pomodoro of the owner
+    OUTPUT:
+        Database is read once for both ranges, each range is trimmed,
+        database is read again after the pomodoro is added
+    """
+    await init_db
+    owner_id = "222222222222222222222222"
+    rollups = [
+        SimpleNamespace(
+            period_start=datetime.datetime(2025, month, 1), study_time=25.0, pomodoro_count=1
+        )
+        for month in (1, 2, 3)
+    ]
+    get_series = mocker.patch.object(
+        StudyTimeRollups, "get_series", new_callable=AsyncMock, return_value=rollups
+    )
+    collection = mocker.patch.object(StudyTimeRollups, "get_pymongo_collection").return_value
+    collection.bulk_write = AsyncMock()
+
+    january = await StudyTimeRollups.get_daily_series(
+        RollupSourceEnum.POMODORO,
+        owner_id,
+        from_date=datetime.datetime(2025, 1, 1),
+        to_date=datetime.datetime(2025, 1, 31),
+    )
+    from_february = await StudyTimeRollups.get_daily_series(
+        RollupSourceEnum.POMODORO,
+        owner_id,
+        from_date=datetime.datetime(2025, 2, 1),
+        to_date=datetime.datetime(2025, 12, 31),
+    )
+
+    assert [day.period_start.month for day in january] == [1]
+    assert [day.period_start.month for day in from_february] == [2, 3]
+    assert get_series.await_count == 1
+
+    await StudyTimeRollups.add_pomodoro(
+        SimpleNamespace(
+            user_id=owner_id, start_at=datetime.datetime(2025, 3, 1, 8), duration=25 * 60
+        )
+    )
+    await StudyTimeRollups.get_daily_series(
+        RollupSourceEnum.POMODORO,
+        owner_id,
+        from_date=datetime.datetime(2025, 1, 1),
+        to_date=datetime.datetime(2025, 1, 31),
+    )
+    assert get_series.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_end_pomodoro_concurrently_rolled_up_once(init_db, mocker):
+    """
+    INPUT:
+        2 stale copies of the same STARTED pomodoro are ended one after the other
+    OUTPUT:
+        Only the first end completes and adds the pomodoro to the rollups,
+        the second end is rejected
+    """
+    await init_db
+    start_at = datetime.datetime.now() - datetime.timedelta(minutes=30)
+    result = await Pomodoros.get_pymongo_collection().insert_one(
+        {
+            "user_id": USER_ID,
+            "duration": 25 * 60,
+            "tasks": [],
+            "start_at": start_at,
+            "status": PomodoroStatusEnum.STARTED.value,
+        }
+    )
+    mocker.patch("models.pomodoro.pomodoros.vn_now", return_value=datetime.datetime.now())
+    add_pomodoro = mocker.patch.object(StudyTimeRollups, "add_pomodoro", new_callable=AsyncMock)
+    first, second = [await Pomodoros.get(result.inserted_id) for _ in range(2)]
+
+    await first.end_section()
+    with pytest.raises(HTTPException):
+        await second.end_section()
+
+    assert add_pomodoro.await_count == 1
+    assert (await Pomodoros.get(result.inserted_id)).status == PomodoroStatusEnum.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_sync_study_time_rollups_catch_up_discord_days(init_db, mocker):
+    """
+    INPUT:
+        Discord days written directly to the collection (no Beanie events),
+        the last rolled up day is updated after it was rolled up
+    OUTPUT:
+        Days from the last rolled up day are upserted in one bulk write,
+        daily series is read again from the database
+    """
+    await init_db
+    user_discord_id = 111111111111111111
+    await UserDailyStudyTimes.get_pymongo_collection().insert_many(
+        [
+            {
+                "user_discord_id": user_discord_id,
+                "date": datetime.datetime(2025, month, day),
+                "study_time": [study_time] + [0] * 23,
+            }
+            for month, day, study_time in ((2, 1, 5), (3, 1, 30), (3, 2, 20))
+        ]
+    )
+    get_series = mocker.patch.object(
+        StudyTimeRollups, "get_series", new_callable=AsyncMock, return_value=[]
+    )
+    collection = mocker.patch.object(StudyTimeRollups, "get_pymongo_collection").return_value
+    collection.find_one = AsyncMock(return_value={"period_start": datetime.datetime(2025, 3, 1)})
+    collection.bulk_write = AsyncMock(
+        return_value=SimpleNamespace(modified_count=1, upserted_count=1)
+    )
+    series_kwargs = dict(
+        source=RollupSourceEnum.DISCORD,
+        owner_id=str(user_discord_id),
+        from_date=datetime.datetime(2025, 3, 1),
+        to_date=datetime.datetime(2025, 3, 31),
+    )
+    await StudyTimeRollups.get_daily_series(**series_kwargs)
+
+    await UserDailyStudyTimes.sync_study_time_rollups(user_discord_id)
+    await StudyTimeRollups.get_daily_series(**series_kwargs)
+
+    assert collection.bulk_write.await_count == 1
+    requests = collection.bulk_write.await_args.args[0]
+    assert [
+        (request._filter["period_start"].day, request._doc["$set"]["study_time"])
+        for request in requests
+    ] == [(1, 30), (2, 20)]
+    assert get_series.await_count == 2
@@ -0,0 +1,55 @@
+import unicodedata
+
+from utils.text_convertion import gen_camel_case, gen_slug
+from utils.text_convertion.language import convert_text_to_standard_type
+
+
+def test_gen_slug_vietnamese_title():
+    """
+    INPUT:
+        Vietnamese title with upper case letters and punctuation
+    OUTPUT:
+        Lower case ascii slug
+    """
+    assert (
+        gen_slug("[HÀ NỘI] Tuyển Tình nguyện viên Mùa hè xanh 2024")
+        == "ha-noi-tuyen-tinh-nguyen-vien-mua-he-xanh-2024"
+    )
+
+
+def test_convert_decomposed_and_other_diacritics():
+    """
+    INPUT:
+        Title in decomposed form (NFD), text with diacritics out of the vietnamese table
+    OUTPUT:
+        Same result as the composed title, diacritics removed
+    """
+    title = "Câu lạc bộ Đồng hành"
+    decomposed_title = unicodedata.normalize("NFD", title)
+
+    assert decomposed_title != title
+    assert convert_text_to_standard_type(decomposed_title) == "cau lac bo dong hanh"
+    assert convert_text_to_standard_type(title) == "cau lac bo dong hanh"
+    assert convert_text_to_standard_type("Señor Çà") == "senor ca"
+
+
+def test_gen_slug_keep_compatibility_characters():
+    """
+    INPUT:
+        Titles with compatibility characters (™, ½) that have no diacritic
+    OUTPUT:
+        Same slug as before the translate engine, characters are not rewritten (no NFKD)
+    """
+    assert gen_slug("Khóa học Python™") == "khoa-hoc-python"
+    assert gen_slug("½ học phí") == "½-hoc-phi"
+    assert convert_text_to_standard_type("ﬁ ½ ²") == "ﬁ ½ ²"
+
+
+def test_gen_camel_case_hashtag():
+    """
+    INPUT:
+        Vietnamese hashtag
+    OUTPUT:
+        Snake case ascii hashtag
+    """
+    assert gen_camel_case("Học bổng") == "hoc_bong"
@@ -0,0 +1,78 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from models import UserSettings
+from models.users import user_settings_cache
+
+pytest_plugins = ("pytest_asyncio",)
+
+USER_ID = "111111111111111111111111"
+
+
+class _FindOne:
+    """Awaitable find_one query that can also be updated"""
+
+    def __init__(self, document):
+        self.document = document
+        self.update = AsyncMock()
+        self.await_count = 0
+
+    def __await__(self):
+        self.await_count += 1
+        return self._get().__await__()
+
+    async def _get(self):
+        return self.document
+
+
+@pytest.mark.asyncio
+async def test_user_settings_cached_until_patched(init_db, auth_client, mocker):
+    """
+    INPUT:
+        Get settings twice, patch settings, get settings again
+    OUTPUT:
+        Settings are read once before the patch and once after, patch does not read
+    """
+    await init_db
+    await user_settings_cache.invalidate(USER_ID)
+    query = _FindOne(UserSettings(id=ObjectId(), user=ObjectId(USER_ID)))
+    mocker.patch.object(UserSettings, "find_one", return_value=query)
+
+    for _ in range(2):
+        response = auth_client.get("/api/users/self/settings")
+        assert response.status_code == 200
+        assert "user" not in response.json()
+    assert query.await_count == 1
+
+    response = auth_client.patch("/api/users/self/settings", json={"language": "en"})
+    assert response.status_code == 204
+    query.update.assert_awaited_once()
+    assert query.await_count == 1
+
+    auth_client.get("/api/users/self/settings")
+    assert query.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_by_user_id_return_copy(init_db, mocker):
+    """
+    INPUT:
+        Change the settings returned from cache
+    OUTPUT:
+        Next caller get the cached settings unchanged
+    """
+    await init_db
+    await user_settings_cache.invalidate(USER_ID)
+    mocker.patch.object(
+        UserSettings,
+        "find_one",
+        return_value=_FindOne(UserSettings(id=ObjectId(), user=ObjectId(USER_ID))),
+    )
+
+    user_setting = await UserSettings.get_by_user_id(USER_ID)
+    user_setting["pomodoro_settings"]["pomodoro_study_time"] = 0
+
+    user_setting = await UserSettings.get_by_user_id(USER_ID)
+    assert user_setting["pomodoro_settings"]["pomodoro_study_time"] == 25 * 60
@@ -41,7 +41,7 @@ async def return_with_pagination(
             if not isinstance(query.get("$limit"), int)
         ]
         result = await cursor.to_list()
-        total_count = (await cursor.to_list())[0]["count"] if len(result) else 0
+        total_count = result[0]["count"] if len(result) else 0
 
     else:
         total_count = await cursor.count()
@@ -61,7 +61,7 @@ async def count_total(cursor):
             if not isinstance(query.get("$limit"), int)
         ]
         result = await cursor.to_list()
-        return (await cursor.to_list())[0]["count"] if len(result) else 0
+        return result[0]["count"] if len(result) else 0
 
     else:
         return await cursor.count()
@@ -0,0 +1,202 @@
+# default
+import asyncio
+import itertools
+import uuid
+from collections import deque
+from enum import Enum
+from typing import AsyncIterator, Deque, List, Optional, Set, Tuple
+
+# libraries
+import orjson
+from sse_starlette.sse import ServerSentEvent
+
+# local
+from .pubsub import MemoryPubSub, PubSubBackend
+
+# all broadcasters, closed with the app (see base/event_handler.py)
+broadcasters: List["Broadcaster"] = []
+
+
+class SlowConsumerPolicyEnum(str, Enum):
+    # drop the oldest buffered event, subscriber keeps streaming with a gap
+    DROP_OLDEST = "DROP_OLDEST"
+    # close the subscriber, client reconnects and replays with Last-Event-ID
+    DISCONNECT = "DISCONNECT"
+
+
+class Subscriber:
+    """
+    A subscriber of Broadcaster with its own bounded buffer of encoded events
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer: Deque[Tuple[str, bytes]] = deque()
+        self.buffer_size = buffer_size
+        self.dropped_count = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, event_id: str, message: bytes, policy: SlowConsumerPolicyEnum) -> None:
+        if self.closed:
+            return
+        if len(self.buffer) >= self.buffer_size:
+            if policy == SlowConsumerPolicyEnum.DISCONNECT:
+                self.close()
+                return
+            self.buffer.popleft()
+            self.dropped_count += 1
+        self.buffer.append((event_id, message))
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wakeup.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until an event is buffered or closed, return False on timeout"""
+        if self.buffer or self.closed:
+            return True
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class Broadcaster:
+    """
+    Fan-out of server-sent events to every subscriber of every worker
+    - Events go through a pub/sub backend (in-memory or Redis), so an event published
+      on one worker reaches subscribers connected to any worker
+    - Each event is serialized once, all subscribers share the encoded bytes
+    - Each subscriber has a bounded buffer, a slow consumer is handled by policy
+    - Recent events are kept to replay for a reconnecting client (Last-Event-ID)
+    Event id: "<publisher node>-<sequence>", unique across workers
+    Example:
+        broadcaster = Broadcaster("pomodoro_rooms", backend=get_pubsub_backend(settings.REDIS_URL))
+        await broadcaster.publish("room_created", {"livekit_room_name": "abc"})
+        async for message in broadcaster.stream(last_event_id=request.headers.get("last-event-id")):
+            yield message
+    """
+
+    def __init__(
+        self,
+        channel: str = "events",
+        backend: Optional[PubSubBackend] = None,
+        buffer_size: int = 100,
+        replay_size: int = 500,
+        retry: int = 15000,
+        keepalive: float = 30,
+        policy: SlowConsumerPolicyEnum = SlowConsumerPolicyEnum.DISCONNECT,
+    ):
+        self.channel = channel
+        self.backend = backend or MemoryPubSub()
+        self.buffer_size = buffer_size
+        self.retry = retry
+        self.keepalive = keepalive
+        self.policy = policy
+        self.subscribers: Set[Subscriber] = set()
+        self._node = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self._last_event_id: Optional[str] = None
+        self._recent_events: Deque[Tuple[str, bytes]] = deque(maxlen=replay_size)
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self.disconnected_count = 0
+        broadcasters.append(self)
+
+    async def start(self) -> None:
+        """Subscribe to the backend channel, called lazily on first publish/stream"""
+        async with self._start_lock:
+            if not self._started:
+                await self.backend.subscribe(self.channel, self._on_message)
+                self._started = True
+
+    async def close(self) -> None:
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+        if self._started:
+            await self.backend.close()
+            self._started = False
+
+    def encode(self, event: str, data: dict) -> Tuple[str, bytes]:
+        event_id = f"{self._node}-{next(self._sequence)}"
+        message = ServerSentEvent(
+            data=orjson.dumps(data).decode(),
+            event=event,
+            id=event_id,
+            retry=self.retry,
+        ).encode()
+        return event_id, message
+
+    async def publish(self, event: str, data: dict) -> None:
+        if not self._started:
+            await self.start()
+        event_id, message = self.encode(event, data)
+        # wire format: "<event id>\n<encoded event>"
+        await self.backend.publish(self.channel, event_id.encode() + b"\n" + message)
+
+    def _on_message(self, payload: bytes) -> None:
+        event_id, _, message = payload.partition(b"\n")
+        self.deliver(event_id.decode(), message)
+
+    def deliver(self, event_id: str, message: bytes) -> None:
+        """Push an encoded event to the subscribers of this worker"""
+        self._last_event_id = event_id
+        self._recent_events.append((event_id, message))
+        for subscriber in list(self.subscribers):
+            subscriber.push(event_id, message, self.policy)
+            if subscriber.closed:
+                self.disconnected_count += 1
+                self.subscribers.discard(subscriber)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        subscriber = Subscriber(self.buffer_size)
+        if last_event_id:
+            # every worker receives events in the same order, replay what follows last_event_id
+            missed_events = None
+            for event_id, message in self._recent_events:
+                if missed_events is not None:
+                    missed_events.append((event_id, message))
+                elif event_id == last_event_id:
+                    missed_events = []
+            # oldest missed events are dropped if they do not fit the buffer
+            for event_id, message in missed_events or []:
+                subscriber.push(event_id, message, SlowConsumerPolicyEnum.DROP_OLDEST)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        self.subscribers.discard(subscriber)
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Yield encoded events of a new subscriber, with keepalive comments when idle"""
+        if not self._started:
+            await self.start()
+        subscriber = self.subscribe(last_event_id)
+        try:
+            while not subscriber.closed or subscriber.buffer:
+                if not await subscriber.wait(self.keepalive):
+                    yield b": keepalive\r\n\r\n"
+                    continue
+                while subscriber.buffer:
+                    yield subscriber.buffer.popleft()[1]
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        lags = [len(subscriber.buffer) for subscriber in self.subscribers]
+        return {
+            "subscriber_count": len(self.subscribers),
+            "last_event_id": self._last_event_id,
+            "max_lag": max(lags, default=0),
+            "total_lag": sum(lags),
+            "dropped_event_count": sum(s.dropped_count for s in self.subscribers),
+            "disconnected_count": self.disconnected_count,
+        }
+
+
+async def close_broadcasters() -> None:
+    await asyncio.gather(*(broadcaster.close() for broadcaster in broadcasters))
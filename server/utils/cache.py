@@ -0,0 +1,175 @@
+# default
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# libraries
+import orjson
+
+
+class TTLCache:
+    """
+    Bounded in-process cache
+    - Least recently used key is evicted when max_size is reached
+    - Entry expires after ttl seconds
+    - Thread safe, sync dependencies (e.g. auth_wrapper) use it from the threadpool
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expire_at, value = item
+            if expire_at <= time.monotonic():
+                self._data.pop(key, None)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expire_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expire_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedCache:
+    """
+    Two tier cache shared across workers
+    - In-process TTLCache in front of an optional Redis (used when redis_url is set
+      and the `redis` extra is installed)
+    - Values must be JSON serializable
+    - Entries are grouped in namespaces, invalidate(namespace) bumps the namespace generation
+      so every entry cached under the old generation is never read again
+    - Without Redis, invalidate only reaches the current worker, entries of other workers
+      expire after unshared_ttl (when shorter than ttl)
+    Example:
+        cache = SharedCache("stats", redis_url=settings.REDIS_URL)
+        value = await cache.get(["user:1"], "2025")
+        await cache.set(["user:1"], "2025", value)
+        await cache.invalidate("user:1")
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        max_size: int = 1024,
+        ttl: float = 60,
+        redis_url: str = "",
+        unshared_ttl: float = 30,
+    ):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.unshared_ttl = unshared_ttl
+        self.redis_url = redis_url
+        self._local = TTLCache(max_size=max_size, ttl=ttl)
+        # only used without redis, a generation is never reused after eviction
+        self._generations = TTLCache(max_size=max_size, ttl=float("inf"))
+        self._generation_counter = itertools.count(1)
+        self._redis = None
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                print("redis is not installed, shared cache fallback to in-process only")
+                self.redis_url = ""
+                return None
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.prefix}:gen:{namespace}"
+
+    async def _get_generations(self, namespaces: list[str]) -> list[str]:
+        redis = self._get_redis()
+        if redis:
+            generations = await redis.mget([self._generation_key(ns) for ns in namespaces])
+            return [(generation or b"0").decode() for generation in generations]
+
+        generations = []
+        for namespace in namespaces:
+            generation = self._generations.get(namespace)
+            if generation is None:
+                generation = next(self._generation_counter)
+                self._generations.set(namespace, generation)
+            generations.append(str(generation))
+        return generations
+
+    async def _build_key(self, namespaces: list[str], key: str) -> str:
+        generations = await self._get_generations(namespaces)
+        return ":".join([self.prefix, *namespaces, *generations, key])
+
+    async def get(self, namespaces: list[str], key: str, default: Any = None) -> Any:
+        try:
+            cache_key = await self._build_key(namespaces, key)
+            value = self._local.get(cache_key)
+            if value is not None:
+                return value
+            redis = self._get_redis()
+            if not redis:
+                return default
+            raw_value = await redis.get(cache_key)
+        except Exception as e:
+            print(f"Shared cache get error: {e}")
+            return default
+        if raw_value is None:
+            return default
+        value = orjson.loads(raw_value)
+        self._local.set(cache_key, value)
+        return value
+
+    async def set(self, namespaces: list[str], key: str, value: Any) -> None:
+        try:
+            cache_key = await self._build_key(namespaces, key)
+            redis = self._get_redis()
+            if redis:
+                self._local.set(cache_key, value)
+                await redis.set(cache_key, orjson.dumps(value), ex=int(self.ttl))
+            else:
+                self._local.set(cache_key, value, ttl=min(self.ttl, self.unshared_ttl))
+        except Exception as e:
+            print(f"Shared cache set error: {e}")
+
+    def clear_local(self) -> None:
+        """Drop entries of the in-process tier"""
+        self._local.clear()
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self._generations.set(namespace, next(self._generation_counter))
+        redis = self._get_redis()
+        if not redis or not namespaces:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for namespace in namespaces:
+                    pipe.incr(self._generation_key(namespace))
+                await pipe.execute()
+        except Exception as e:
+            print(f"Shared cache invalidate error: {e}")
@@ -0,0 +1,86 @@
+# default
+import asyncio
+import contextlib
+from collections import Counter
+from typing import Any, List, Optional
+
+# libraries
+from pymongo import UpdateOne
+
+# all counters, started/stopped with the app (see base/event_handler.py)
+counters: List["BufferedCounter"] = []
+
+
+class BufferedCounter:
+    """
+    Coalesce increments of a counter field in memory, flushed periodically with $inc
+    in one unordered bulk_write (N increments of a hot document -> 1 write per interval)
+    Example:
+        post_view_counter = BufferedCounter(Posts, "view")
+        post_view_counter.increment(post.id)
+    """
+
+    def __init__(self, model, field: str, key_field: str = "_id", flush_interval: float = 10):
+        self.model = model
+        self.field = field
+        self.key_field = key_field
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        counters.append(self)
+
+    def increment(self, key: Any, amount: int = 1) -> None:
+        self._pending[key] += amount
+
+    def pending(self, key: Any) -> int:
+        """Increments of a key not flushed yet"""
+        return self._pending.get(key, 0)
+
+    async def flush(self) -> int:
+        """Write pending increments, return number of updated keys"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, Counter()
+        requests = [
+            UpdateOne({self.key_field: key}, {"$inc": {self.field: amount}})
+            for key, amount in pending.items()
+        ]
+        try:
+            await self.model.get_pymongo_collection().bulk_write(requests, ordered=False)
+        except Exception as e:
+            print(f"Flush {self.model.__name__}.{self.field} counter error: {e}")
+            # keep increments for the next flush
+            self._pending.update(pending)
+            return 0
+        except BaseException:
+            # cancelled mid-write (e.g. shutdown), keep increments for the final flush
+            self._pending.update(pending)
+            raise
+        return len(requests)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            # wait for a flush in progress to give back its increments
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+
+def start_counters() -> None:
+    for counter in counters:
+        counter.start()
+
+
+async def stop_counters() -> None:
+    await asyncio.gather(*(counter.stop() for counter in counters))
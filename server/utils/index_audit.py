@@ -0,0 +1,80 @@
+# default
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+
+class QueryShape(NamedTuple):
+    """
+    A query the app runs, values only need the right type
+    Example:
+        QueryShape("last pomodoro of user", Pomodoros, {"user_id": "x"}, [("start_at", -1)])
+    """
+
+    name: str
+    model: Any
+    filter: dict
+    sort: Optional[List[Tuple[str, int]]] = None
+
+
+def get_plan_stages(plan: dict) -> List[str]:
+    """All stages of a query plan, from the root to the leaves"""
+    stages = []
+    plans = [plan]
+    while plans:
+        current_plan = plans.pop()
+        if "stage" in current_plan:
+            stages.append(current_plan["stage"])
+        if "inputStage" in current_plan:
+            plans.append(current_plan["inputStage"])
+        plans.extend(current_plan.get("inputStages", []))
+        # slot based engine nests the classic plan in queryPlan
+        if "queryPlan" in current_plan:
+            plans.append(current_plan["queryPlan"])
+    return stages
+
+
+async def explain_query_shape(query_shape: QueryShape) -> dict:
+    collection = query_shape.model.get_pymongo_collection()
+    cursor = collection.find(query_shape.filter).limit(1)
+    if query_shape.sort:
+        cursor = cursor.sort(query_shape.sort)
+    explain = await cursor.explain()
+    stages = get_plan_stages(explain["queryPlanner"]["winningPlan"])
+    return {
+        "name": query_shape.name,
+        "collection": collection.name,
+        "stages": stages,
+        # an in-memory SORT means the index does not serve the sort
+        "collection_scan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+    }
+
+
+def print_explain_result(result: dict) -> None:
+    status = "OK"
+    if result["collection_scan"]:
+        status = "COLLSCAN"
+    elif result["in_memory_sort"]:
+        status = "SORT"
+    print(
+        f"[{status:<8}] {result['collection']}: {result['name']} ({' <- '.join(result['stages'])})"
+    )
+
+
+async def audit_indexes(query_shapes: List[QueryShape]) -> List[dict]:
+    """
+    Explain every query shape and print the ones not served by an index
+    Returns:
+        Explain summary of every query shape
+    """
+    results = [await explain_query_shape(query_shape) for query_shape in query_shapes]
+    for result in results:
+        print_explain_result(result)
+    return results
+
+
+async def report_plan(query_shape: QueryShape) -> None:
+    """Print the plan of a query built at runtime, for dev mode only (one more round trip)"""
+    try:
+        print_explain_result(await explain_query_shape(query_shape))
+    except Exception as e:
+        print(f"Explain {query_shape.name} error: {e}")
@@ -0,0 +1,98 @@
+# default
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List
+
+MessageHandler = Callable[[bytes], None]
+
+
+class PubSubBackend(ABC):
+    """
+    Delivers messages published on a channel to every subscribed handler,
+    including handlers of other workers when the backend is shared
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None: ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryPubSub(PubSubBackend):
+    """
+    In-process backend, only reaches subscribers of the same worker
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for handler in self._handlers.get(channel, []):
+            handler(message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+
+class RedisPubSub(PubSubBackend):
+    """
+    Redis pub/sub backend, reaches subscribers of every worker/replica
+    Needs the `redis` extra
+    """
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(redis_url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+        self._reader: asyncio.Task | None = None
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._redis.publish(channel, message)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        if channel not in self._handlers:
+            await self._pubsub.subscribe(channel)
+        self._handlers.setdefault(channel, []).append(handler)
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    channel = message["channel"].decode()
+                    for handler in self._handlers.get(channel, []):
+                        handler(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Redis pub/sub reader error: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+            self._reader = None
+        await self._pubsub.aclose()
+        await self._redis.aclose()
+
+
+def get_pubsub_backend(redis_url: str = "") -> PubSubBackend:
+    """
+    Redis backend when redis_url is set and redis is installed, in-memory otherwise
+    """
+    if redis_url:
+        try:
+            return RedisPubSub(redis_url)
+        except ImportError:
+            print("redis is not installed, pub/sub fallback to in-memory")
+    return MemoryPubSub()
@@ -0,0 +1,94 @@
+# default
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# libraries
+import orjson
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+# local
+from .cache import SharedCache
+
+# endpoint content and extra headers (pagination, ...) of a cache miss
+GetContent = Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def is_etag_matched(request: Request, etag: str) -> bool:
+    """If-None-Match contains etag (weak comparison, * matches any)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    for value in if_none_match.split(","):
+        value = value.strip().removeprefix("W/")
+        if value == "*" or value == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Cache of serialized JSON responses of public GET endpoints
+    - A cache miss is validated and serialized once, hits return the stored bytes
+    - Key is the path with normalized params (validated, sorted), so the same request
+      with params in another order or with defaults spelled out shares one entry
+    - ETag of the body, a matching If-None-Match gets an empty 304
+    - Entries are grouped in namespaces (see SharedCache), invalidated by write routes
+    Example:
+        post_response_cache = ResponseCache("posts_response", redis_url=settings.REDIS_URL)
+        return await post_response_cache.get_or_set(
+            request, ["posts"], params.model_dump(), List[GetPostListResponse], get_content
+        )
+        await post_response_cache.invalidate("posts")
+    """
+
+    def __init__(self, prefix: str, max_size: int = 1024, ttl: float = 60, redis_url: str = ""):
+        self.cache = SharedCache(prefix, max_size=max_size, ttl=ttl, redis_url=redis_url)
+        self._adapters: Dict[Any, TypeAdapter] = {}
+
+    def _get_adapter(self, response_type: Any) -> TypeAdapter:
+        adapter = self._adapters.get(response_type)
+        if adapter is None:
+            adapter = self._adapters[response_type] = TypeAdapter(response_type)
+        return adapter
+
+    @staticmethod
+    def make_key(request: Request, params: dict) -> str:
+        return request.url.path + ":" + orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode()
+
+    @staticmethod
+    def build_response(request: Request, entry: dict) -> Response:
+        if is_etag_matched(request, entry["etag"]):
+            return Response(status_code=304, headers={"etag": entry["etag"]})
+        return Response(
+            content=entry["body"].encode(),
+            media_type="application/json",
+            headers={**entry["headers"], "etag": entry["etag"]},
+        )
+
+    async def get_or_set(
+        self,
+        request: Request,
+        namespaces: List[str],
+        params: dict,
+        response_type: Any,
+        get_content: GetContent,
+    ) -> Response:
+        key = self.make_key(request, params)
+        entry = await self.cache.get(namespaces, key)
+        if entry is None:
+            content, headers = await get_content()
+            body = self._get_adapter(response_type).dump_json(content)
+            entry = {"body": body.decode(), "etag": make_etag(body), "headers": headers}
+            await self.cache.set(namespaces, key, entry)
+        return self.build_response(request, entry)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        await self.cache.invalidate(*namespaces)
+
+    def clear_local(self) -> None:
+        self.cache.clear_local()
@@ -1,3 +1,7 @@
+# default
+import functools
+import unicodedata
+
 vietnamese_name_convertions = {
     "ă": "a",
     "â": "a",
@@ -69,17 +73,42 @@ vietnamese_name_convertions = {
 }
 
 
-def convert_text_to_standard_type(string: str) -> str:
-    global vietnamese_name_convertions
+# str.translate table of vietnamese_name_convertions, lower and upper case
+vietnamese_translation_table = str.maketrans(
+    {
+        **vietnamese_name_convertions,
+        **{k.upper(): v for k, v in vietnamese_name_convertions.items()},
+    }
+)
 
-    # lower name
-    string = string.lower()
-    # convert to non-operator string
-    string = "".join(
-        [
-            vietnamese_name_convertions[x] if x in vietnamese_name_convertions.keys() else x
-            for x in string
-        ]
-    )
 
-    return string
+@functools.lru_cache(maxsize=4096)
+def remove_combining_marks(char: str) -> str:
+    """
+    Character without its combining marks (canonical NFD decomposition),
+    characters without combining marks are kept as is (no compatibility rewrite: ™, ½)
+    Example:
+        "ñ" -> "n", "\u0301" -> "", "½" -> "½"
+    """
+    decomposed = unicodedata.normalize("NFD", char)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped if len(stripped) < len(decomposed) else char
+
+
+def convert_text_to_standard_type(string: str) -> str:
+    """
+    Lower case and remove diacritics
+    - Vietnamese letters are mapped with one str.translate pass
+    - Diacritics the table does not cover (decomposed input, other languages) are removed
+      by remove_combining_marks, only for non-ascii leftovers
+    Example:
+        "Câu Lạc Bộ Tình Nguyện" -> "cau lac bo tinh nguyen"
+    """
+    string = string.lower()
+    if string.isascii():
+        return string
+    string = string.translate(vietnamese_translation_table)
+    if string.isascii():
+        return string
+    # đ has no decomposition, translate again after removing combining marks
+    return "".join(map(remove_combining_marks, string)).translate(vietnamese_translation_table)
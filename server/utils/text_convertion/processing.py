@@ -1,3 +1,6 @@
+# default
+from functools import lru_cache
+
 # libs
 from pyheck import kebab, snake
 
@@ -5,12 +8,15 @@ from pyheck import kebab, snake
 from .language import convert_text_to_standard_type
 
 
+# titles and hashtags repeat a lot (post lists, related posts, facebook hashtags)
+@lru_cache(maxsize=4096)
 def gen_slug(s: str) -> str:
     """Generates a slug from the given text, handling various cases."""
     s = convert_text_to_standard_type(s)
     return kebab(s)
 
 
+@lru_cache(maxsize=4096)
 def gen_camel_case(s: str) -> str:
     s = convert_text_to_standard_type(s)
     return snake(s)